@@ -0,0 +1,164 @@
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+import shapely
+from shapely.geometry import box, shape
+
+# Reader connections kept open per database
+DEFAULT_POOL_SIZE = 8
+
+# Rows written per executemany call during bulk loads
+BULK_BATCH_SIZE = 5000
+
+# Upper bound on features returned by one bbox query
+DEFAULT_QUERY_LIMIT = 1000
+
+SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS features (
+        id INTEGER PRIMARY KEY,
+        layer TEXT NOT NULL,
+        properties TEXT NOT NULL,
+        geometry TEXT NOT NULL
+    )''',
+    'CREATE INDEX IF NOT EXISTS features_layer ON features (layer)',
+    'CREATE VIRTUAL TABLE IF NOT EXISTS features_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)'
+]
+
+class FeatureStore:
+    """GeoJSON features in SQLite, indexed by an R*Tree of their bounding boxes"""
+
+    def __init__(self, app=None, pool_size=DEFAULT_POOL_SIZE):
+        self.pool_size = pool_size
+        self.path = None
+        self._pool = None
+        self._write_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Use the SQLite file behind the app's SQLAlchemy URI and create the feature tables"""
+        uri = app.config['SQLALCHEMY_DATABASE_URI']
+        if not uri.startswith('sqlite:///'):
+            raise ValueError('FeatureStore requires a SQLite database')
+        self.init_path(uri[len('sqlite:///'):])
+
+    def init_path(self, path):
+        """Open a pool of connections to a SQLite file and create the feature tables"""
+        self.path = path
+        self._pool = queue.Queue()
+        for _ in range(self.pool_size):
+            self._pool.put(self._connect())
+
+        with self.connection() as conn:
+            # WAL lets readers proceed while a bulk load is writing
+            conn.execute('PRAGMA journal_mode=WAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def _connect(self):
+        """Open one pooled connection"""
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection from the pool for the duration of a block"""
+        if self._pool is None:
+            raise RuntimeError('FeatureStore is not initialised; call init_app first')
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def bulk_load(self, layer, features, replace=False):
+        """Insert GeoJSON features into a layer in batched transactions; returns the number loaded"""
+        loaded = 0
+        # SQLite allows a single writer, so serialise writes instead of retrying on SQLITE_BUSY
+        with self._write_lock, self.connection() as conn:
+            try:
+                if replace:
+                    conn.execute('DELETE FROM features_rtree WHERE id IN (SELECT id FROM features WHERE layer = ?)', (layer,))
+                    conn.execute('DELETE FROM features WHERE layer = ?', (layer,))
+
+                batch = []
+                for feature in features:
+                    batch.append(feature)
+                    if len(batch) >= BULK_BATCH_SIZE:
+                        loaded += self._insert_batch(conn, layer, batch)
+                        batch = []
+                if batch:
+                    loaded += self._insert_batch(conn, layer, batch)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return loaded
+
+    def _insert_batch(self, conn, layer, batch):
+        """Write one batch of features and their bounding boxes"""
+        geoms = [shape(feature['geometry']) for feature in batch]
+        bounds = shapely.bounds(geoms)
+        start = conn.execute('SELECT COALESCE(MAX(id), 0) FROM features').fetchone()[0] + 1
+        ids = range(start, start + len(batch))
+
+        conn.executemany(
+            'INSERT INTO features (id, layer, properties, geometry) VALUES (?, ?, ?, ?)',
+            [
+                (fid, layer, json.dumps(feature.get('properties') or {}), json.dumps(feature['geometry']))
+                for fid, feature in zip(ids, batch)
+            ]
+        )
+        conn.executemany(
+            'INSERT INTO features_rtree (id, min_lon, max_lon, min_lat, max_lat) VALUES (?, ?, ?, ?, ?)',
+            [(fid, b[0], b[2], b[1], b[3]) for fid, b in zip(ids, bounds.tolist())]
+        )
+        return len(batch)
+
+    def query_bbox(self, bbox, layer=None, limit=DEFAULT_QUERY_LIMIT):
+        """Features whose geometry intersects bbox (min_lon, min_lat, max_lon, max_lat), via the R*Tree"""
+        if limit < 1:
+            raise ValueError('Limit must be a positive integer')
+        min_lon, min_lat, max_lon, max_lat = bbox
+        sql = '''SELECT f.id, f.layer, f.properties, f.geometry, r.min_lon, r.min_lat, r.max_lon, r.max_lat
+                 FROM features_rtree r CROSS JOIN features f ON f.id = r.id
+                 WHERE r.min_lon <= ? AND r.max_lon >= ? AND r.min_lat <= ? AND r.max_lat >= ?'''
+        params = [max_lon, min_lon, max_lat, min_lat]
+        if layer is not None:
+            # CROSS JOIN pins the R*Tree as the outer loop; otherwise SQLite drives the join from the
+            # layer index and probes the R*Tree once per feature in the layer
+            sql += ' AND f.layer = ?'
+            params.append(layer)
+
+        # The R*Tree matches bounding boxes; an exact test drops features that only overlap by box
+        query_box = box(min_lon, min_lat, max_lon, max_lat)
+        features = []
+        with self.connection() as conn:
+            # Rows are pulled lazily so decoding and geometry tests stop once limit matches are found
+            for fid, feature_layer, properties, geometry, *feature_box in conn.execute(sql, params):
+                geometry = json.loads(geometry)
+                # A stored box inside the query box cannot miss it, so only straddling features are parsed
+                contained = (feature_box[0] >= min_lon and feature_box[1] >= min_lat and
+                             feature_box[2] <= max_lon and feature_box[3] <= max_lat)
+                if not contained and not shape(geometry).intersects(query_box):
+                    continue
+                features.append({
+                    'type': 'Feature',
+                    'id': fid,
+                    'geometry': geometry,
+                    'properties': dict(json.loads(properties), layer=feature_layer)
+                })
+                if len(features) >= limit:
+                    break
+        return features
+
+    def layers(self):
+        """Feature counts per layer"""
+        with self.connection() as conn:
+            return dict(conn.execute('SELECT layer, COUNT(*) FROM features GROUP BY layer').fetchall())
+
+feature_store = FeatureStore()
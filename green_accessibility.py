@@ -0,0 +1,173 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import shapely
+from shapely.geometry import shape
+from scipy.ndimage import distance_transform_edt
+from src.routes.india_projection import WGS84, projection_for_extent, reproject_layer
+
+EARTH_RADIUS_M = 6371008.8
+
+# Default grid cell size in meters
+DEFAULT_RESOLUTION_M = 50
+
+# Margin added around a city's green spaces when no explicit extent is given
+DEFAULT_MARGIN_M = 2000
+
+# Largest grid built for one surface; the mask, distances and transform scratch space scale with it
+MAX_GRID_CELLS = 16_000_000
+
+# Surfaces kept in memory before the least recently used one is dropped
+MAX_CACHED_SURFACES = 16
+
+class AccessibilitySurface:
+    """Distance in meters from every grid cell to the nearest green space, computed once per city"""
+
+    def __init__(self, green_geoms, bounds, resolution=DEFAULT_RESOLUTION_M):
+        min_lon, min_lat, max_lon, max_lat = bounds
+        self.projection = projection_for_extent(bounds)
+        self.resolution = float(resolution)
+
+        # Grid covers the projected extent of all four corners
+        xs, ys = self.projection.forward([min_lon, max_lon, min_lon, max_lon], [min_lat, min_lat, max_lat, max_lat])
+        self.x0, self.y0 = float(xs.min()), float(ys.min())
+        self.cols = max(int(np.ceil((xs.max() - self.x0) / self.resolution)), 1)
+        self.rows = max(int(np.ceil((ys.max() - self.y0) / self.resolution)), 1)
+        if self.rows * self.cols > MAX_GRID_CELLS:
+            raise ValueError(f'A {self.resolution:g} m grid needs {self.rows * self.cols} cells over this extent; '
+                             f'the maximum is {MAX_GRID_CELLS}, so use a coarser resolution')
+
+        metric_geoms = [self.projection.geometry(geom) for geom in green_geoms]
+        self.green_mask = self._rasterize(metric_geoms)
+
+        # Euclidean distance transform measures distance to the nearest zero cell
+        if self.green_mask.any():
+            self.distance = distance_transform_edt(~self.green_mask, sampling=self.resolution).astype(np.float32)
+        else:
+            self.distance = np.full((self.rows, self.cols), np.inf, dtype=np.float32)
+
+    def _cell_centers(self, row_slice, col_slice):
+        """Metric coordinates of the centres of a block of cells"""
+        xs = self.x0 + (np.arange(self.cols)[col_slice] + 0.5) * self.resolution
+        ys = self.y0 + (np.arange(self.rows)[row_slice] + 0.5) * self.resolution
+        return np.meshgrid(xs, ys)
+
+    def _rasterize(self, metric_geoms):
+        """Burn geometries into a boolean grid, testing only cells inside each geometry's bounds"""
+        mask = np.zeros((self.rows, self.cols), dtype=bool)
+
+        for geom in metric_geoms:
+            if geom.is_empty:
+                continue
+            minx, miny, maxx, maxy = geom.bounds
+            c0, c1 = self._clip_range(minx, maxx, self.x0, self.cols)
+            r0, r1 = self._clip_range(miny, maxy, self.y0, self.rows)
+            if c0 >= c1 or r0 >= r1:
+                continue
+
+            # Points and lines are thinner than a cell, so burn the cells they touch
+            if geom.area == 0:
+                touched = shapely.get_coordinates(shapely.segmentize(geom, self.resolution / 2))
+                rows, cols = self._cells_of(touched[:, 0], touched[:, 1])
+                inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+                mask[rows[inside], cols[inside]] = True
+                continue
+
+            xs, ys = self._cell_centers(slice(r0, r1), slice(c0, c1))
+            mask[r0:r1, c0:c1] |= shapely.contains_xy(geom, xs, ys)
+
+        return mask
+
+    def _clip_range(self, low, high, origin, size):
+        """Cell index range covering [low, high] along one axis, clipped to the grid"""
+        start = int(np.floor((low - origin) / self.resolution))
+        stop = int(np.ceil((high - origin) / self.resolution))
+        return max(start, 0), min(stop, size)
+
+    def _cells_of(self, x, y):
+        """Row and column of the cells containing metric points"""
+        cols = np.floor((np.asarray(x) - self.x0) / self.resolution).astype(np.int64)
+        rows = np.floor((np.asarray(y) - self.y0) / self.resolution).astype(np.int64)
+        return rows, cols
+
+    def distance_at(self, lon, lat):
+        """Distance in meters to the nearest green space for arrays of points; NaN outside the grid"""
+        # Repeated point layers (households, sensors) are projected once and then cached
+        rows, cols = self._cells_of(*reproject_layer(np.atleast_1d(lon), np.atleast_1d(lat), WGS84, self.projection.crs))
+        inside = (rows >= 0) & (rows < self.rows) & (cols >= 0) & (cols < self.cols)
+        distances = np.full(rows.shape, np.nan, dtype=np.float64)
+        distances[inside] = self.distance[rows[inside], cols[inside]]
+        return distances
+
+    def zone_statistics(self, zone_geom, threshold_m):
+        """Mean and max distance over a zone, plus the share of its area within threshold_m"""
+        zone_mask = self._rasterize([self.projection.geometry(zone_geom)])
+        values = self.distance[zone_mask]
+        if len(values) == 0:
+            return None
+        return {
+            'mean_distance_m': float(values.mean()),
+            'max_distance_m': float(values.max()),
+            'share_within_threshold': float((values <= threshold_m).mean()),
+            'cells': int(len(values))
+        }
+
+    def summary(self, threshold_m):
+        """City-wide coverage and accessibility figures derived from the surface"""
+        cell_area_km2 = (self.resolution / 1000) ** 2
+        return {
+            'total_green_space_area': round(float(self.green_mask.sum() * cell_area_km2), 3),
+            'green_space_percentage': round(float(self.green_mask.mean() * 100), 1),
+            'average_distance_to_green_space': round(float(self.distance.mean() / 1000), 3),
+            'share_within_threshold': round(float((self.distance <= threshold_m).mean()), 3)
+        }
+
+# City name -> (green space geometries in lon/lat, extent bounds)
+_city_green_spaces = {}
+
+# (city, resolution) -> AccessibilitySurface
+_surface_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def register_city_green_spaces(city, geometries, bounds=None):
+    """Store a city's green spaces (shapely geometries or GeoJSON dicts) and drop its cached surfaces"""
+    geoms = [shape(geom) if isinstance(geom, dict) else geom for geom in geometries]
+
+    if bounds is None:
+        min_lon, min_lat, max_lon, max_lat = shapely.total_bounds(geoms)
+        margin_lat = DEFAULT_MARGIN_M / (np.radians(1.0) * EARTH_RADIUS_M)
+        margin_lon = margin_lat / np.cos(np.radians((min_lat + max_lat) / 2))
+        bounds = (min_lon - margin_lon, min_lat - margin_lat, max_lon + margin_lon, max_lat + margin_lat)
+
+    with _cache_lock:
+        _city_green_spaces[city] = (geoms, tuple(bounds))
+        for key in [key for key in _surface_cache if key[0] == city]:
+            del _surface_cache[key]
+
+def get_accessibility_surface(city, resolution=DEFAULT_RESOLUTION_M):
+    """Return the cached accessibility surface for a city and grid resolution, building it on first use"""
+    key = (city, float(resolution))
+    with _cache_lock:
+        if key in _surface_cache:
+            _surface_cache.move_to_end(key)
+            return _surface_cache[key]
+        if city not in _city_green_spaces:
+            raise KeyError(f"No green spaces registered for city '{city}'")
+        geoms, bounds = _city_green_spaces[city]
+
+    surface = AccessibilitySurface(geoms, bounds, resolution)
+
+    with _cache_lock:
+        # Keep whichever surface landed first if two requests built it concurrently
+        surface = _surface_cache.setdefault(key, surface)
+        _surface_cache.move_to_end(key)
+        while len(_surface_cache) > MAX_CACHED_SURFACES:
+            _surface_cache.popitem(last=False)
+    return surface
+
+def green_space_polygon(lon, lat, area_km2):
+    """Approximate a green space of known area as a circle around its centroid"""
+    radius_m = np.sqrt(area_km2 * 1e6 / np.pi)
+    projection = projection_for_extent((lon, lat, lon, lat))
+    x, y = projection.forward(lon, lat)
+    return projection.inverse_geometry(shapely.Point(x, y).buffer(radius_m))
@@ -0,0 +1,189 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from src.routes.india_projection import projection_for_extent
+
+# Mainland India extent as (min_lon, min_lat, max_lon, max_lat)
+INDIA_BOUNDS = (68.1, 6.5, 97.4, 35.7)
+
+DEFAULT_RESOLUTION_KM = 10.0
+
+# Inverse-distance weighting defaults
+DEFAULT_NEIGHBOURS = 8
+DEFAULT_POWER = 2.0
+
+# Grid cells solved per block when kriging, bounding the station x cell matrix
+KRIGING_BLOCK_SIZE = 20000
+
+# Largest grid interpolated for one surface; every cell is also serialised in the JSON response
+MAX_GRID_CELLS = 2_000_000
+
+# Most stations accepted for kriging, which factors a dense (stations + 1)^2 system
+MAX_KRIGING_STATIONS = 2000
+
+# Surfaces kept in memory before the least recently used one is dropped
+MAX_CACHED_SURFACES = 64
+
+# Sample CPCB-style AQI station readings for major cities
+SAMPLE_AQI_STATIONS = [
+    {'name': 'Delhi', 'lon': 77.2090, 'lat': 28.6139, 'value': 168},
+    {'name': 'Mumbai', 'lon': 72.8777, 'lat': 19.0760, 'value': 145},
+    {'name': 'Kolkata', 'lon': 88.3639, 'lat': 22.5726, 'value': 152},
+    {'name': 'Bangalore', 'lon': 77.5946, 'lat': 12.9716, 'value': 98},
+    {'name': 'Chennai', 'lon': 80.2707, 'lat': 13.0827, 'value': 91},
+    {'name': 'Hyderabad', 'lon': 78.4867, 'lat': 17.3850, 'value': 112},
+    {'name': 'Ahmedabad', 'lon': 72.5714, 'lat': 23.0225, 'value': 134},
+    {'name': 'Pune', 'lon': 73.8567, 'lat': 18.5204, 'value': 104},
+    {'name': 'Lucknow', 'lon': 80.9462, 'lat': 26.8467, 'value': 176},
+    {'name': 'Patna', 'lon': 85.1376, 'lat': 25.5941, 'value': 181}
+]
+
+class InterpolatedSurface:
+    """A regular lon/lat grid of interpolated values over a region"""
+
+    def __init__(self, values, bounds, resolution_km, method):
+        self.values = values
+        self.bounds = bounds
+        self.resolution_km = resolution_km
+        self.method = method
+
+    def value_at(self, lon, lat):
+        """Nearest-cell value for arrays of points; NaN outside the region"""
+        min_lon, min_lat, max_lon, max_lat = self.bounds
+        rows, cols = self.values.shape
+        col = np.floor((np.asarray(lon) - min_lon) / (max_lon - min_lon) * cols).astype(np.int64)
+        row = np.floor((np.asarray(lat) - min_lat) / (max_lat - min_lat) * rows).astype(np.int64)
+        inside = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        out = np.full(row.shape, np.nan)
+        out[inside] = self.values[row[inside], col[inside]]
+        return out
+
+    def to_dict(self):
+        """JSON-ready grid, row 0 at the southern edge"""
+        return {
+            'bounds': list(self.bounds),
+            'resolution_km': self.resolution_km,
+            'method': self.method,
+            'shape': list(self.values.shape),
+            'values': np.round(self.values, 1).tolist(),
+            'min': round(float(self.values.min()), 1),
+            'max': round(float(self.values.max()), 1),
+            'mean': round(float(self.values.mean()), 1)
+        }
+
+def _grid(bounds, resolution_km, projection):
+    """Metric coordinates of cell centres for a lon/lat region at roughly resolution_km spacing"""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    xs, ys = projection.forward([min_lon, max_lon, min_lon, max_lon], [min_lat, min_lat, max_lat, max_lat])
+    cols = max(int(np.ceil((xs.max() - xs.min()) / (resolution_km * 1000))), 1)
+    rows = max(int(np.ceil((ys.max() - ys.min()) / (resolution_km * 1000))), 1)
+    if rows * cols > MAX_GRID_CELLS:
+        raise ValueError(f'A {resolution_km:g} km grid needs {rows * cols} cells over this extent; '
+                         f'the maximum is {MAX_GRID_CELLS}, so use a coarser resolution')
+
+    lons = min_lon + (np.arange(cols) + 0.5) * (max_lon - min_lon) / cols
+    lats = min_lat + (np.arange(rows) + 0.5) * (max_lat - min_lat) / rows
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    x, y = projection.forward(lon_grid.ravel(), lat_grid.ravel())
+    return np.column_stack([x, y]), (rows, cols)
+
+def idw(station_xy, station_values, target_xy, k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER):
+    """Inverse-distance weighting over the k nearest stations, found with a KD-tree for all targets at once"""
+    k = min(k, len(station_values))
+    distances, indices = cKDTree(station_xy).query(target_xy, k=k)
+    if k == 1:
+        return station_values[indices]
+    distances = distances.reshape(len(target_xy), k)
+    indices = indices.reshape(len(target_xy), k)
+
+    with np.errstate(divide='ignore'):
+        weights = 1.0 / distances ** power
+    estimates = (weights * station_values[indices]).sum(axis=1) / weights.sum(axis=1)
+
+    # Targets sitting on a station take its reading exactly
+    exact = distances[:, 0] == 0
+    estimates[exact] = station_values[indices[exact, 0]]
+    return estimates
+
+def ordinary_kriging(station_xy, station_values, target_xy):
+    """Ordinary kriging with an exponential variogram fitted from the station spread"""
+    # Co-located stations would make the system singular, so they are merged into one mean reading
+    station_xy, group = np.unique(station_xy, axis=0, return_inverse=True)
+    group = group.ravel()
+    station_values = np.bincount(group, weights=station_values) / np.bincount(group)
+    n = len(station_values)
+    pairwise = cdist(station_xy, station_xy)
+    sill = max(float(np.var(station_values)), 1e-9)
+    # Practical range of a third of the station spread is a common default without a fitted variogram
+    range_m = max(float(pairwise.max()) / 3, 1.0)
+
+    def variogram(h):
+        return sill * (1 - np.exp(-3 * h / range_m))
+
+    system = np.ones((n + 1, n + 1))
+    system[:n, :n] = variogram(pairwise)
+    system[n, n] = 0.0
+
+    # Factor once, then solve blocks of targets together as right-hand side matrices
+    factors = lu_factor(system)
+    estimates = np.empty(len(target_xy))
+    for start in range(0, len(target_xy), KRIGING_BLOCK_SIZE):
+        block = target_xy[start:start + KRIGING_BLOCK_SIZE]
+        rhs = np.ones((n + 1, len(block)))
+        rhs[:n] = variogram(cdist(station_xy, block))
+        estimates[start:start + len(block)] = station_values @ lu_solve(factors, rhs)[:n]
+    return estimates
+
+INTERPOLATORS = {
+    'idw': idw,
+    'kriging': ordinary_kriging
+}
+
+def interpolate_surface(stations, bounds=INDIA_BOUNDS, resolution_km=DEFAULT_RESOLUTION_KM, method='idw'):
+    """Interpolate scattered station readings onto a regular grid over bounds"""
+    if method not in INTERPOLATORS:
+        raise ValueError(f"Unknown interpolation method '{method}'. Use one of: {', '.join(INTERPOLATORS)}")
+    if not stations:
+        raise ValueError('At least one station reading is required')
+    if method == 'kriging' and len(stations) > MAX_KRIGING_STATIONS:
+        raise ValueError(f'Kriging accepts at most {MAX_KRIGING_STATIONS} stations; use idw for larger networks')
+
+    projection = projection_for_extent(bounds)
+
+    lons = np.array([station['lon'] for station in stations], dtype=float)
+    lats = np.array([station['lat'] for station in stations], dtype=float)
+    values = np.array([station['value'] for station in stations], dtype=float)
+    station_xy = np.column_stack(projection.forward(lons, lats))
+
+    target_xy, shape = _grid(bounds, resolution_km, projection)
+    estimates = INTERPOLATORS[method](station_xy, values, target_xy)
+    return InterpolatedSurface(estimates.reshape(shape), tuple(bounds), resolution_km, method)
+
+_surface_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _readings_digest(stations):
+    """Stable fingerprint of a set of readings, so corrected data never hits a stale surface"""
+    readings = sorted((float(s['lon']), float(s['lat']), float(s['value'])) for s in stations)
+    return hashlib.sha1(repr(readings).encode()).hexdigest()
+
+def get_interpolated_surface(stations, timestamp, bounds=INDIA_BOUNDS, resolution_km=DEFAULT_RESOLUTION_KM, method='idw'):
+    """Cached surface per (timestamp, region, resolution, method) and reading set"""
+    key = (timestamp, tuple(bounds), float(resolution_km), method, _readings_digest(stations))
+    with _cache_lock:
+        if key in _surface_cache:
+            _surface_cache.move_to_end(key)
+            return _surface_cache[key]
+
+    surface = interpolate_surface(stations, bounds, resolution_km, method)
+
+    with _cache_lock:
+        _surface_cache[key] = surface
+        _surface_cache.move_to_end(key)
+        while len(_surface_cache) > MAX_CACHED_SURFACES:
+            _surface_cache.popitem(last=False)
+    return surface
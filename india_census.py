@@ -0,0 +1,178 @@
+import os
+import threading
+import numpy as np
+
+# Environment variable naming a village-level census .npz file
+CENSUS_PATH_ENV = 'INDIA_CENSUS_PATH'
+
+# Administrative hierarchy, coarsest first; census codes are unique within each level
+LEVELS = ('state', 'district', 'subdistrict', 'village')
+
+ROLLUP_LEVELS = ('india',) + LEVELS
+
+# Derived indicators as (numerator, denominator, scale), evaluated on rolled-up sums
+RATIOS = {
+    'population_density_per_km2': ('population', 'area_km2', 1),
+    'literacy_rate_percentage': ('literate', 'population_7_plus', 100),
+    'rural_population_percentage': ('rural_population', 'population', 100),
+    'youth_population_percentage': ('youth_population', 'population', 100),
+    'sex_ratio_females_per_1000_males': ('female_population', 'male_population', 1000)
+}
+
+FILTER_OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal
+}
+
+class CensusRollup:
+    """Summed indicators for every unit at one level of one census year"""
+
+    def __init__(self, codes, parents, sums):
+        self.codes = codes
+        self.parents = parents
+        self.sums = sums
+
+    def value(self, indicator):
+        """Summed indicator or derived ratio for every unit"""
+        if indicator in self.sums:
+            return self.sums[indicator]
+        if indicator in RATIOS:
+            numerator, denominator, scale = RATIOS[indicator]
+            if numerator not in self.sums or denominator not in self.sums:
+                raise KeyError(f"Ratio '{indicator}' needs the '{numerator}' and '{denominator}' columns")
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return scale * self.sums[numerator] / self.sums[denominator]
+        raise KeyError(f"Unknown indicator '{indicator}'")
+
+class CensusCube:
+    """Village-level census columns rolled up along state > district > sub-district > village for each year"""
+
+    def __init__(self, villages_by_year):
+        self.rollups = {}
+        for year, columns in villages_by_year.items():
+            indicators = {name: np.asarray(values, dtype=np.float64)
+                          for name, values in columns.items() if name not in LEVELS}
+            codes = {level: np.asarray(columns[level], dtype=np.int64) for level in LEVELS}
+
+            self.rollups[(year, 'india')] = CensusRollup(
+                np.zeros(1, dtype=np.int64), {}, {name: values.sum(keepdims=True) for name, values in indicators.items()}
+            )
+            for depth, level in enumerate(LEVELS):
+                # Dense group ids let np.bincount sum every indicator in one pass per column
+                unit_codes, first_row, group = np.unique(codes[level], return_index=True, return_inverse=True)
+                parents = {parent: codes[parent][first_row] for parent in LEVELS[:depth]}
+                sums = {name: np.bincount(group, weights=values, minlength=len(unit_codes))
+                        for name, values in indicators.items()}
+                self.rollups[(year, level)] = CensusRollup(unit_codes, parents, sums)
+
+    def years(self):
+        """Census years held in the cube"""
+        return sorted({year for year, _ in self.rollups})
+
+    def indicators(self):
+        """Summed columns and the ratios they make available"""
+        columns = set()
+        for rollup in self.rollups.values():
+            columns.update(rollup.sums)
+        ratios = [name for name, (num, den, _) in RATIOS.items() if num in columns and den in columns]
+        return sorted(columns), ratios
+
+    def query(self, year, level, indicators, within=None, filters=None, sort_by=None, descending=True, limit=None):
+        """Group-by over precomputed rollups with parent restriction, indicator filters and ordering"""
+        if (year, level) not in self.rollups:
+            raise KeyError(f'No census rollup for year {year} at level {level}')
+        rollup = self.rollups[(year, level)]
+        mask = np.ones(len(rollup.codes), dtype=bool)
+
+        for parent, code in (within or {}).items():
+            if parent not in rollup.parents:
+                raise ValueError(f"Level '{level}' cannot be restricted by '{parent}'")
+            mask &= rollup.parents[parent] == int(code)
+
+        for condition in filters or []:
+            operator = FILTER_OPERATORS.get(condition.get('op'))
+            if operator is None:
+                raise ValueError(f"Filter operator must be one of: {', '.join(FILTER_OPERATORS)}")
+            with np.errstate(invalid='ignore'):
+                mask &= operator(rollup.value(condition['indicator']), float(condition['value']))
+
+        selected = np.flatnonzero(mask)
+        if sort_by is not None:
+            keys = rollup.value(sort_by)[selected]
+            keys = np.where(np.isnan(keys), -np.inf if descending else np.inf, keys)
+            order = np.argsort(-keys if descending else keys, kind='stable')
+            selected = selected[order]
+        if limit is not None:
+            selected = selected[:limit]
+
+        values = {name: rollup.value(name)[selected] for name in indicators}
+        units = []
+        for position, row in enumerate(selected.tolist()):
+            unit = {level: int(rollup.codes[row])} if level != 'india' else {}
+            unit.update({parent: int(codes[row]) for parent, codes in rollup.parents.items()})
+            unit.update({
+                name: None if np.isnan(column[position]) else round(float(column[position]), 3)
+                for name, column in values.items()
+            })
+            units.append(unit)
+        return {'year': year, 'level': level, 'units_matched': int(mask.sum()), 'units': units}
+
+    @classmethod
+    def load(cls, path):
+        """Load a cube from an .npz with '<year>.<column>' arrays, one row per village"""
+        villages_by_year = {}
+        with np.load(path) as data:
+            for key in data.files:
+                year, column = key.split('.', 1)
+                villages_by_year.setdefault(int(year), {})[column] = data[key]
+        return cls(villages_by_year)
+
+def synthetic_census(years=(2001, 2011), states=4, districts_per_state=5, subdistricts_per_district=4,
+                     villages_per_subdistrict=50, seed=0):
+    """Generate village-level census columns with nested codes, for testing"""
+    rng = np.random.default_rng(seed)
+    villages = states * districts_per_state * subdistricts_per_district * villages_per_subdistrict
+    index = np.arange(villages)
+    village_code = 100000 + index
+    subdistrict_code = 1000 + index // villages_per_subdistrict
+    district_code = 100 + index // (villages_per_subdistrict * subdistricts_per_district)
+    state_code = 1 + index // (villages_per_subdistrict * subdistricts_per_district * districts_per_state)
+
+    area = rng.uniform(1, 20, villages)
+    data = {}
+    for step, year in enumerate(years):
+        population = np.round(area * rng.uniform(100, 900, villages) * (1.15 ** step))
+        males = np.round(population * rng.uniform(0.49, 0.53, villages))
+        aged_7_plus = np.round(population * rng.uniform(0.85, 0.9, villages))
+        data[year] = {
+            'state': state_code,
+            'district': district_code,
+            'subdistrict': subdistrict_code,
+            'village': village_code,
+            'area_km2': area,
+            'population': population,
+            'male_population': males,
+            'female_population': population - males,
+            'population_7_plus': aged_7_plus,
+            'literate': np.round(aged_7_plus * rng.uniform(0.5, 0.9, villages)),
+            'rural_population': np.round(population * rng.uniform(0.5, 1.0, villages)),
+            'youth_population': np.round(population * rng.uniform(0.25, 0.32, villages))
+        }
+    return data
+
+_cube = None
+_cube_lock = threading.Lock()
+
+def get_census_cube():
+    """The shared census cube for the configured file, built on first use"""
+    global _cube
+    with _cube_lock:
+        if _cube is None:
+            path = os.environ.get(CENSUS_PATH_ENV)
+            if not path or not os.path.exists(path):
+                return None
+            _cube = CensusCube.load(path)
+        return _cube
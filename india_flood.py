@@ -0,0 +1,425 @@
+import heapq
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Environment variable naming a district scores file written by save_district_flood_scores().
+# Filling and accumulating a state-sized DEM takes far too long for a request, so scores are built offline.
+FLOOD_SCORES_PATH_ENV = 'INDIA_FLOOD_SCORES_PATH'
+
+DEFAULT_TILE_SIZE = 1024
+
+# Rise added per cell when filling flats, so every cell has a strictly lower neighbour
+DEFAULT_EPSILON = 1e-4
+
+# Topographic wetness index above which a cell counts as flood-susceptible
+DEFAULT_TWI_THRESHOLD = 10.0
+
+# Fill depth in meters above which a cell counts as part of a closed depression
+DEFAULT_DEPRESSION_DEPTH = 0.5
+
+# Floor on slope (rise over run) so flat cells get a finite wetness index
+MIN_SLOPE = 0.001
+
+# Weights combining wetness and depression shares into a 0-10 district risk score
+TWI_WEIGHT = 0.7
+DEPRESSION_WEIGHT = 0.3
+
+# D8 neighbour offsets and their distances in cells
+D8_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+D8_DISTANCES = [np.hypot(dr, dc) for dr, dc in D8_OFFSETS]
+
+def _tile_windows(shape, tile_size):
+    """Row and column bounds of every tile covering a raster"""
+    rows, cols = shape
+    return [
+        (r0, min(r0 + tile_size, rows), c0, min(c0 + tile_size, cols))
+        for r0 in range(0, rows, tile_size)
+        for c0 in range(0, cols, tile_size)
+    ]
+
+def _read_with_halo(array, window, fill):
+    """Read a tile plus a one-cell halo, padding cells beyond the raster edge with fill"""
+    r0, r1, c0, c1 = window
+    rows, cols = array.shape
+    out = np.full((r1 - r0 + 2, c1 - c0 + 2), fill, dtype=np.float64)
+    rr0, rr1 = max(r0 - 1, 0), min(r1 + 1, rows)
+    cc0, cc1 = max(c0 - 1, 0), min(c1 + 1, cols)
+    out[rr0 - r0 + 1:rr1 - r0 + 1, cc0 - c0 + 1:cc1 - c0 + 1] = array[rr0:rr1, cc0:cc1]
+    return out
+
+def _fill_tile(dem_path, level_path, window, epsilon):
+    """Priority-flood one tile, seeded by its halo's current water levels and by its own outlets"""
+    dem = np.load(dem_path, mmap_mode='r')
+    levels = np.load(level_path, mmap_mode='r')
+    z = _read_with_halo(dem, window, np.nan)
+    halo_levels = _read_with_halo(levels, window, np.nan)
+    h, w = z.shape
+
+    nodata = np.isnan(z)
+    interior = np.zeros((h, w), dtype=bool)
+    interior[1:-1, 1:-1] = True
+
+    # Halo cells are fixed at the neighbouring tile's current level
+    level = np.where(interior, np.inf, halo_levels)
+
+    # Cells next to the raster edge or nodata drain off the map, so they keep their elevation
+    next_to_nodata = np.zeros((h, w), dtype=bool)
+    for dr, dc in D8_OFFSETS:
+        next_to_nodata[1:-1, 1:-1] |= nodata[1 + dr:h - 1 + dr, 1 + dc:w - 1 + dc]
+    outlets = interior & next_to_nodata & ~nodata
+    level[outlets] = z[outlets]
+
+    seeds = np.flatnonzero((outlets | ~interior) & ~nodata & np.isfinite(level))
+    heap = list(zip(level.ravel()[seeds].tolist(), seeds.tolist()))
+    done = (~interior | outlets | nodata).ravel().tolist()
+    level = level.ravel().tolist()
+    z_flat = z.ravel().tolist()
+    offsets = [dr * w + dc for dr, dc in D8_OFFSETS]
+    size = h * w
+
+    heapq.heapify(heap)
+    while heap:
+        current, i = heapq.heappop(heap)
+        for o in offsets:
+            n = i + o
+            # Halo seeds have neighbours beyond the padded tile; every halo cell is already done
+            if n < 0 or n >= size or done[n]:
+                continue
+            done[n] = True
+            level[n] = z_flat[n] if z_flat[n] > current else current + epsilon
+            heapq.heappush(heap, (level[n], n))
+
+    result = np.array(level, dtype=np.float64).reshape(h, w)[1:-1, 1:-1]
+    result[nodata[1:-1, 1:-1]] = np.nan
+    return result
+
+def _flow_targets(level_path, window, shape):
+    """Steepest-descent D8 target of each tile cell as a global flat index (-1 where flow leaves the map)"""
+    levels = _read_with_halo(np.load(level_path, mmap_mode='r'), window, np.nan)
+    r0, r1, c0, c1 = window
+    h, w = r1 - r0, c1 - c0
+    centre = levels[1:-1, 1:-1]
+
+    best_slope = np.zeros((h, w))
+    best_offset = np.full((h, w), -1, dtype=np.int64)
+    for k, ((dr, dc), dist) in enumerate(zip(D8_OFFSETS, D8_DISTANCES)):
+        neighbour = levels[1 + dr:1 + dr + h, 1 + dc:1 + dc + w]
+        with np.errstate(invalid='ignore'):
+            slope = (centre - neighbour) / dist
+        better = slope > best_slope
+        best_slope[better] = slope[better]
+        best_offset[better] = k
+
+    rows, cols = np.mgrid[r0:r1, c0:c1]
+    drow = np.array([dr for dr, _ in D8_OFFSETS] + [0])[best_offset]
+    dcol = np.array([dc for _, dc in D8_OFFSETS] + [0])[best_offset]
+    targets = (rows + drow) * shape[1] + (cols + dcol)
+    targets[best_offset < 0] = -1
+    return targets, best_slope
+
+def _accumulate(order, targets, weights):
+    """Push weights downstream in upstream-first order; targets are local indices or -1"""
+    acc = weights.tolist()
+    targets = targets.tolist()
+    for i in order:
+        t = targets[i]
+        if t >= 0:
+            acc[t] += acc[i]
+    return np.array(acc)
+
+def _local_flow(level_path, window, shape):
+    """Flow targets of a tile split into in-tile links and exits, plus an upstream-first ordering"""
+    r0, r1, c0, c1 = window
+    w = c1 - c0
+    targets, slope = _flow_targets(level_path, window, shape)
+    targets = targets.ravel()
+    target_rows, target_cols = np.divmod(targets, shape[1])
+
+    inside = (targets >= 0) & (target_rows >= r0) & (target_rows < r1) & (target_cols >= c0) & (target_cols < c1)
+    local_targets = np.where(inside, (target_rows - r0) * w + (target_cols - c0), -1)
+    exits = (targets >= 0) & ~inside
+
+    levels = np.load(level_path, mmap_mode='r')[r0:r1, c0:c1].ravel()
+    valid = ~np.isnan(levels)
+    order = np.argsort(-np.where(valid, levels, -np.inf), kind='stable')
+    order = order[valid[order]]
+    return targets, local_targets, exits, order, slope, valid
+
+def _perimeter_mask(h, w):
+    """Flat mask of the outermost ring of cells in an h x w tile"""
+    mask = np.zeros((h, w), dtype=bool)
+    mask[0, :] = mask[-1, :] = mask[:, 0] = mask[:, -1] = True
+    return mask.ravel()
+
+def _global_index(window, shape):
+    """Global flat index of every cell in a tile window"""
+    r0, r1, c0, c1 = window
+    rows, cols = np.mgrid[r0:r1, c0:c1]
+    return (rows * shape[1] + cols).ravel()
+
+def _accumulation_pass_one(level_path, window, shape, cell_weight):
+    """Local accumulation of a tile, reduced to what crosses its boundary"""
+    r0, r1, c0, c1 = window
+    h, w = r1 - r0, c1 - c0
+    targets, local_targets, exits, order, _, valid = _local_flow(level_path, window, shape)
+    weights = np.where(valid, cell_weight, 0.0)
+    acc = _accumulate(order, local_targets, weights)
+
+    # Follow each cell downstream to the cell where its flow leaves the tile (-1 if it never does)
+    link = np.full(h * w, -1, dtype=np.int64)
+    global_index = _global_index(window, shape)
+    link[exits] = global_index[exits]
+    link_list = link.tolist()
+    local_list = local_targets.tolist()
+    for i in order[::-1].tolist():
+        t = local_list[i]
+        if t >= 0:
+            link_list[i] = link_list[t]
+    link = np.array(link_list, dtype=np.int64)
+
+    perimeter = _perimeter_mask(h, w) & valid
+    return {
+        'exit_cells': global_index[exits],
+        'exit_targets': targets[exits],
+        'exit_acc': acc[exits],
+        'perimeter_cells': global_index[perimeter],
+        'perimeter_links': link[perimeter]
+    }
+
+def _resolve_boundary_flows(tile_summaries):
+    """Solve the small inter-tile graph for the total inflow entering each tile perimeter cell"""
+    links = {}
+    for summary in tile_summaries:
+        links.update(zip(summary['perimeter_cells'].tolist(), summary['perimeter_links'].tolist()))
+
+    local_acc = {}
+    exit_target = {}
+    for summary in tile_summaries:
+        local_acc.update(zip(summary['exit_cells'].tolist(), summary['exit_acc'].tolist()))
+        exit_target.update(zip(summary['exit_cells'].tolist(), summary['exit_targets'].tolist()))
+
+    # Each exit feeds the exit its target cell drains through in the neighbouring tile
+    downstream = {e: links.get(t, -1) for e, t in exit_target.items()}
+    indegree = dict.fromkeys(local_acc, 0)
+    for d in downstream.values():
+        if d >= 0:
+            indegree[d] += 1
+
+    total = dict(local_acc)
+    ready = [e for e, n in indegree.items() if n == 0]
+    while ready:
+        e = ready.pop()
+        d = downstream[e]
+        if d >= 0:
+            total[d] += total[e]
+            indegree[d] -= 1
+            if indegree[d] == 0:
+                ready.append(d)
+
+    inflow = {}
+    for e, t in exit_target.items():
+        inflow[t] = inflow.get(t, 0.0) + total[e]
+    return inflow
+
+def _accumulation_pass_two(dem_path, level_path, acc_path, district_path, window, shape, cell_size,
+                           inflow, num_districts, twi_threshold, depression_depth):
+    """Final accumulation of a tile including upstream inflow, reduced to per-district sums"""
+    r0, r1, c0, c1 = window
+    h, w = r1 - r0, c1 - c0
+    _, local_targets, _, order, slope, valid = _local_flow(level_path, window, shape)
+
+    global_index = _global_index(window, shape)
+    weights = np.where(valid, 1.0, 0.0)
+    perimeter = np.flatnonzero(_perimeter_mask(h, w))
+    weights[perimeter] += [inflow.get(g, 0.0) for g in global_index[perimeter].tolist()]
+    acc = _accumulate(order, local_targets, weights).reshape(h, w)
+
+    accumulation = np.load(acc_path, mmap_mode='r+')
+    accumulation[r0:r1, c0:c1] = np.where(valid.reshape(h, w), acc, np.nan)
+    accumulation.flush()
+
+    # Topographic wetness index: ln(specific catchment area / tan(slope))
+    slope_ratio = np.maximum(slope / cell_size, MIN_SLOPE)
+    with np.errstate(divide='ignore'):
+        twi = np.log(acc * cell_size / slope_ratio)
+
+    depth = np.load(level_path, mmap_mode='r')[r0:r1, c0:c1] - np.load(dem_path, mmap_mode='r')[r0:r1, c0:c1]
+    districts = np.load(district_path, mmap_mode='r')[r0:r1, c0:c1]
+    counted = valid.reshape(h, w) & (districts >= 0)
+
+    ids = districts[counted].astype(np.int64)
+    return {
+        'cells': np.bincount(ids, minlength=num_districts),
+        'twi_sum': np.bincount(ids, weights=twi[counted], minlength=num_districts),
+        'high_twi': np.bincount(ids, weights=twi[counted] >= twi_threshold, minlength=num_districts),
+        'depression': np.bincount(ids, weights=depth[counted] > depression_depth, minlength=num_districts)
+    }
+
+class FloodSusceptibilityPipeline:
+    """Fill, D8 flow direction and flow accumulation over a DEM processed in tiles across a process pool"""
+
+    def __init__(self, tile_size=DEFAULT_TILE_SIZE, epsilon=DEFAULT_EPSILON, max_workers=None,
+                 twi_threshold=DEFAULT_TWI_THRESHOLD, depression_depth=DEFAULT_DEPRESSION_DEPTH):
+        self.tile_size = tile_size
+        self.epsilon = epsilon
+        self.max_workers = max_workers
+        self.twi_threshold = twi_threshold
+        self.depression_depth = depression_depth
+
+    def run(self, dem, districts, cell_size, work_dir=None):
+        """Score every district from a DEM and an aligned district-id raster (arrays or .npy paths)"""
+        owns_work_dir = work_dir is None
+        work_dir = work_dir or tempfile.mkdtemp(prefix='india_flood_')
+        try:
+            dem_path = self._as_npy(dem, os.path.join(work_dir, 'dem.npy'), np.float64)
+            district_path = self._as_npy(districts, os.path.join(work_dir, 'districts.npy'), np.int64)
+            shape = np.load(dem_path, mmap_mode='r').shape
+            level_path = os.path.join(work_dir, 'filled.npy')
+            acc_path = os.path.join(work_dir, 'accumulation.npy')
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                self._fill(pool, dem_path, level_path, shape)
+                stats = self._accumulate(pool, dem_path, level_path, acc_path, district_path, shape, cell_size)
+
+            return self._district_scores(stats)
+        finally:
+            if owns_work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _as_npy(self, data, path, dtype):
+        """Spill an in-memory array to a .npy file so workers can memory-map it"""
+        if isinstance(data, str):
+            return data
+        np.save(path, np.asarray(data, dtype=dtype))
+        return path
+
+    def _fill(self, pool, dem_path, level_path, shape):
+        """Iterate tile floods, exchanging halo levels, until no tile boundary changes"""
+        dem = np.load(dem_path, mmap_mode='r')
+        levels = np.lib.format.open_memmap(level_path, mode='w+', dtype=np.float64, shape=shape)
+        for r0, r1, c0, c1 in _tile_windows(shape, self.tile_size):
+            levels[r0:r1, c0:c1] = np.where(np.isnan(dem[r0:r1, c0:c1]), np.nan, np.inf)
+        levels.flush()
+
+        windows = _tile_windows(shape, self.tile_size)
+        tiles_per_col = -(-shape[0] // self.tile_size)
+        tiles_per_row = -(-shape[1] // self.tile_size)
+        active = set(range(len(windows)))
+
+        while active:
+            batch = sorted(active)
+            results = pool.map(_fill_tile, [dem_path] * len(batch), [level_path] * len(batch),
+                               [windows[t] for t in batch], [self.epsilon] * len(batch))
+
+            active = set()
+            for t, result in zip(batch, results):
+                r0, r1, c0, c1 = windows[t]
+                old = np.array(levels[r0:r1, c0:c1])
+                if np.array_equal(old, result, equal_nan=True):
+                    continue
+                levels[r0:r1, c0:c1] = result
+
+                # Neighbouring tiles read this tile as their halo, so they must rerun
+                ti, tj = divmod(t, tiles_per_row)
+                for di in (-1, 0, 1):
+                    for dj in (-1, 0, 1):
+                        ni, nj = ti + di, tj + dj
+                        if (di or dj) and 0 <= ni < tiles_per_col and 0 <= nj < tiles_per_row:
+                            active.add(ni * tiles_per_row + nj)
+            levels.flush()
+
+    def _accumulate(self, pool, dem_path, level_path, acc_path, district_path, shape, cell_size):
+        """Two tiled accumulation passes joined by a global solve over tile-boundary flows"""
+        windows = _tile_windows(shape, self.tile_size)
+        n = len(windows)
+        summaries = list(pool.map(_accumulation_pass_one, [level_path] * n, windows, [shape] * n, [1.0] * n))
+        inflow = _resolve_boundary_flows(summaries)
+
+        districts = np.load(district_path, mmap_mode='r')
+        num_districts = int(max((districts[r0:r1, c0:c1].max(initial=-1) for r0, r1, c0, c1 in windows))) + 1
+        np.lib.format.open_memmap(acc_path, mode='w+', dtype=np.float64, shape=shape).flush()
+
+        # Only the inflows landing in a tile are shipped to its worker
+        tile_inflows = [{} for _ in windows]
+        tiles_per_row = -(-shape[1] // self.tile_size)
+        for cell, value in inflow.items():
+            row, col = divmod(cell, shape[1])
+            tile_inflows[(row // self.tile_size) * tiles_per_row + col // self.tile_size][cell] = value
+
+        partials = pool.map(_accumulation_pass_two, [dem_path] * n, [level_path] * n, [acc_path] * n,
+                            [district_path] * n, windows, [shape] * n, [cell_size] * n, tile_inflows,
+                            [num_districts] * n, [self.twi_threshold] * n, [self.depression_depth] * n)
+
+        stats = {key: np.zeros(num_districts) for key in ('cells', 'twi_sum', 'high_twi', 'depression')}
+        for partial in partials:
+            for key in stats:
+                stats[key] += partial[key]
+        return stats
+
+    def _district_scores(self, stats):
+        """Turn summed per-district counts into wetness, depression and risk figures"""
+        scores = {}
+        for district in np.flatnonzero(stats['cells']):
+            cells = stats['cells'][district]
+            high_twi_share = stats['high_twi'][district] / cells
+            depression_share = stats['depression'][district] / cells
+            scores[int(district)] = {
+                'cells': int(cells),
+                'mean_twi': round(float(stats['twi_sum'][district] / cells), 3),
+                'high_twi_share': round(float(high_twi_share), 4),
+                'depression_share': round(float(depression_share), 4),
+                'risk_score': round(float(10 * (TWI_WEIGHT * high_twi_share + DEPRESSION_WEIGHT * depression_share)), 2)
+            }
+        return scores
+
+def synthetic_dem(rows, cols, seed=0, pits=20):
+    """Generate a tilted, noisy DEM with random closed depressions, in meters, for testing"""
+    rng = np.random.default_rng(seed)
+    r, c = np.mgrid[0:rows, 0:cols]
+    dem = 200.0 - 0.05 * r - 0.02 * c + rng.normal(0, 0.5, (rows, cols))
+    for _ in range(pits):
+        pr, pc = rng.integers(rows), rng.integers(cols)
+        radius = rng.uniform(3, max(4, min(rows, cols) / 10))
+        depth = rng.uniform(1, 5)
+        dem -= depth * np.clip(1 - np.hypot(r - pr, c - pc) / radius, 0, None)
+    return dem
+
+def synthetic_districts(rows, cols, district_rows=2, district_cols=3):
+    """Split a raster into a regular grid of district ids, for testing"""
+    r, c = np.mgrid[0:rows, 0:cols]
+    return (r * district_rows // rows) * district_cols + (c * district_cols // cols)
+
+def build_district_flood_scores(dem, districts, path, cell_size=30.0, **pipeline_options):
+    """Run the pipeline over a DEM and district raster offline and save the scores for the service to load"""
+    scores = FloodSusceptibilityPipeline(**pipeline_options).run(dem, districts, cell_size)
+    save_district_flood_scores(scores, path)
+    return scores
+
+def save_district_flood_scores(scores, path):
+    """Write per-district scores as JSON keyed by district id"""
+    with open(path, 'w') as f:
+        json.dump({str(district): score for district, score in scores.items()}, f)
+
+def load_district_flood_scores(path):
+    """Read scores written by save_district_flood_scores()"""
+    with open(path) as f:
+        return {int(district): score for district, score in json.load(f).items()}
+
+_flood_scores = None
+_flood_scores_lock = threading.Lock()
+
+def get_district_flood_scores():
+    """Per-district flood scores from the configured precomputed file, loaded once and then reused"""
+    global _flood_scores
+    with _flood_scores_lock:
+        if _flood_scores is None:
+            path = os.environ.get(FLOOD_SCORES_PATH_ENV)
+            if not path or not os.path.exists(path):
+                return None
+            _flood_scores = load_district_flood_scores(path)
+        return _flood_scores
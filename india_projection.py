@@ -0,0 +1,110 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import shapely
+from pyproj import Transformer
+
+WGS84 = 'EPSG:4326'
+
+# Albers equal-area conic tuned for the Indian mainland, used when an extent spans several UTM zones
+INDIA_EQUAL_AREA = '+proj=aea +lat_0=20 +lon_0=80 +lat_1=12 +lat_2=28 +datum=WGS84 +units=m +no_defs'
+
+UTM_ZONE_WIDTH = 6
+
+# Projected layers kept in memory before the least recently used one is dropped
+MAX_CACHED_LAYERS = 128
+
+# pyproj Transformers are not safe to share between threads, so each thread keeps its own
+_thread_state = threading.local()
+
+def get_transformer(src_crs, dst_crs):
+    """Cached always_xy Transformer between two CRSs for the calling thread"""
+    cache = getattr(_thread_state, 'transformers', None)
+    if cache is None:
+        cache = _thread_state.transformers = {}
+    key = (src_crs, dst_crs)
+    if key not in cache:
+        cache[key] = Transformer.from_crs(src_crs, dst_crs, always_xy=True)
+    return cache[key]
+
+def utm_zone(lon):
+    """UTM zone number containing a longitude"""
+    return int((lon + 180) // UTM_ZONE_WIDTH) % 60 + 1
+
+def select_crs(bounds):
+    """Best metric CRS for a lon/lat extent: its UTM zone if it fits in one, else India equal-area"""
+    min_lon, min_lat, max_lon, max_lat = bounds
+    if max_lon - min_lon > UTM_ZONE_WIDTH:
+        return INDIA_EQUAL_AREA
+
+    # Extents narrower than a zone that straddle a boundary use the zone holding their centre
+    zone = utm_zone((min_lon + max_lon) / 2)
+    hemisphere = 32600 if (min_lat + max_lat) / 2 >= 0 else 32700
+    return f'EPSG:{hemisphere + zone}'
+
+class Projection:
+    """Bulk lon/lat <-> metric transforms for one CRS, backed by cached Transformers"""
+
+    def __init__(self, crs):
+        self.crs = crs
+
+    def forward(self, lon, lat):
+        """Project lon/lat arrays to x/y meters"""
+        return get_transformer(WGS84, self.crs).transform(np.asarray(lon, dtype=float), np.asarray(lat, dtype=float))
+
+    def inverse(self, x, y):
+        """Unproject x/y meters back to lon/lat"""
+        return get_transformer(self.crs, WGS84).transform(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+
+    def geometry(self, geom):
+        """Project a lon/lat shapely geometry into meters in one array transform"""
+        return shapely.transform(geom, lambda coords: np.column_stack(self.forward(coords[:, 0], coords[:, 1])))
+
+    def inverse_geometry(self, geom):
+        """Unproject a metric shapely geometry back to lon/lat"""
+        return shapely.transform(geom, lambda coords: np.column_stack(self.inverse(coords[:, 0], coords[:, 1])))
+
+def projection_for_extent(bounds):
+    """Projection in the best metric CRS for a lon/lat extent"""
+    return Projection(select_crs(bounds))
+
+_layer_cache = OrderedDict()
+_layer_lock = threading.Lock()
+
+def _array_digest(x, y):
+    """Fingerprint of a coordinate layer, so identical layers share cache entries"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(x, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    return digest.hexdigest()
+
+def _remember(key, coords):
+    """Store a transformed layer, evicting the least recently used beyond the cache size"""
+    _layer_cache[key] = coords
+    _layer_cache.move_to_end(key)
+    while len(_layer_cache) > MAX_CACHED_LAYERS:
+        _layer_cache.popitem(last=False)
+
+def reproject_layer(x, y, src_crs, dst_crs):
+    """Transform a whole coordinate layer at once, serving repeats and round trips from cache"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    key = (_array_digest(x, y), src_crs, dst_crs)
+    with _layer_lock:
+        if key in _layer_cache:
+            _layer_cache.move_to_end(key)
+            return _layer_cache[key]
+
+    out_x, out_y = get_transformer(src_crs, dst_crs).transform(x, y)
+    out_x.flags.writeable = False
+    out_y.flags.writeable = False
+    inputs = (x.copy(), y.copy())
+    inputs[0].flags.writeable = False
+    inputs[1].flags.writeable = False
+
+    with _layer_lock:
+        _remember(key, (out_x, out_y))
+        # Projecting the result back returns the original coordinates exactly, without a transform
+        _remember((_array_digest(out_x, out_y), dst_crs, src_crs), inputs)
+    return out_x, out_y
@@ -0,0 +1,284 @@
+import heapq
+import os
+import threading
+import numpy as np
+
+# Environment variables pointing at .npz network files written by RoutingEngine.save(), per transport mode.
+# Landmark precomputation runs dozens of full searches, so build these offline rather than at request time.
+NETWORK_PATH_ENV = {
+    'road': 'INDIA_ROAD_NETWORK',
+    'rail': 'INDIA_RAIL_NETWORK'
+}
+
+# Landmarks precomputed for ALT (A*, landmarks, triangle inequality) lower bounds
+DEFAULT_LANDMARKS = 16
+
+class RoutingGraph:
+    """Directed, weighted network stored as compressed sparse row (CSR) arrays"""
+
+    def __init__(self, indptr, indices, weights, lon=None, lat=None):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.lon = None if lon is None else np.asarray(lon, dtype=np.float64)
+        self.lat = None if lat is None else np.asarray(lat, dtype=np.float64)
+        self.num_nodes = len(self.indptr) - 1
+        self._adjacency = None
+
+    def adjacency(self):
+        """CSR arrays as Python lists, built once, since search loops index them element by element"""
+        if self._adjacency is None:
+            self._adjacency = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._adjacency
+
+    @classmethod
+    def from_edges(cls, sources, targets, weights, num_nodes=None, lon=None, lat=None, directed=False):
+        """Build a CSR graph from parallel edge arrays; undirected edges are added both ways"""
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float32)
+
+        if np.any(weights < 0):
+            raise ValueError('Edge weights must be non-negative')
+
+        if not directed:
+            sources, targets = np.concatenate([sources, targets]), np.concatenate([targets, sources])
+            weights = np.concatenate([weights, weights])
+
+        if num_nodes is None:
+            num_nodes = int(max(sources.max(initial=-1), targets.max(initial=-1))) + 1
+
+        # Sort edges by source so each node's out-edges are contiguous
+        order = np.argsort(sources, kind='stable')
+        counts = np.bincount(sources, minlength=num_nodes)
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+
+        return cls(indptr, targets[order], weights[order], lon=lon, lat=lat)
+
+    def reversed(self):
+        """Return the graph with every edge direction flipped"""
+        sources = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        return RoutingGraph.from_edges(self.indices, sources, self.weights, num_nodes=self.num_nodes,
+                                       lon=self.lon, lat=self.lat, directed=True)
+
+    def nearest_node(self, lon, lat):
+        """Snap a coordinate to the closest network node (equirectangular approximation)"""
+        if self.lon is None or self.lat is None:
+            raise ValueError('Graph has no node coordinates to snap against')
+        dx = (self.lon - lon) * np.cos(np.radians(lat))
+        dy = self.lat - lat
+        return int(np.argmin(dx * dx + dy * dy))
+
+def dijkstra(graph, source, targets=None, max_cost=np.inf):
+    """Single-source shortest path costs, stopping early once all targets are settled or max_cost is exceeded"""
+    inf = float('inf')
+    dist = [inf] * graph.num_nodes
+    dist[source] = 0.0
+    settled = [False] * graph.num_nodes
+    remaining = None if targets is None else set(int(t) for t in targets)
+    indptr, indices, weights = graph.adjacency()
+    heap = [(0.0, source)]
+
+    while heap:
+        d, u = heapq.heappop(heap)
+        if settled[u]:
+            continue
+        if d > max_cost:
+            break
+        settled[u] = True
+
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                break
+
+        for i in range(indptr[u], indptr[u + 1]):
+            v = indices[i]
+            nd = d + weights[i]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+
+    # Tentative distances of unsettled nodes are not final
+    dist = np.array(dist)
+    dist[~np.array(settled)] = np.inf
+    return dist
+
+class RoutingEngine:
+    """Shortest-path, one-to-many and isochrone queries accelerated with ALT landmarks"""
+
+    def __init__(self, graph, num_landmarks=DEFAULT_LANDMARKS, seed=0):
+        self.graph = graph
+        self.reverse_graph = graph.reversed()
+        self.landmarks = self._select_landmarks(num_landmarks, seed)
+
+        # Node-major layout so one node's bounds are a contiguous row
+        self.dist_from = np.empty((graph.num_nodes, len(self.landmarks)), dtype=np.float32)
+        self.dist_to = np.empty((graph.num_nodes, len(self.landmarks)), dtype=np.float32)
+        for i, landmark in enumerate(self.landmarks):
+            self.dist_from[:, i] = dijkstra(graph, landmark)
+            self.dist_to[:, i] = dijkstra(self.reverse_graph, landmark)
+
+    def _select_landmarks(self, num_landmarks, seed):
+        """Pick landmarks by farthest-point selection so they sit on the network periphery"""
+        num_landmarks = min(num_landmarks, self.graph.num_nodes)
+        if num_landmarks == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        rng = np.random.default_rng(seed)
+        landmarks = [int(rng.integers(self.graph.num_nodes))]
+        min_dist = np.full(self.graph.num_nodes, np.inf)
+
+        for _ in range(num_landmarks):
+            dist = dijkstra(self.graph, landmarks[-1])
+            min_dist = np.minimum(min_dist, dist)
+
+            # Unreachable nodes seed the next landmark so every component gets coverage
+            candidates = np.where(np.isinf(min_dist), np.finfo(np.float64).max, min_dist)
+            # The random start is not a landmark yet, so it stays eligible on small graphs
+            candidates[landmarks[1:]] = -1
+            # Every node is already a landmark, so further picks would only repeat one
+            if candidates.max() < 0:
+                break
+            landmarks.append(int(np.argmax(candidates)))
+
+        # The random starting node is only used to find the first real landmark
+        return np.array(landmarks[1:], dtype=np.int64)
+
+    def _lower_bound(self, node, target_from, target_to):
+        """Triangle-inequality lower bound on the cost from node to the query target"""
+        bound = 0.0
+        # A landmark unreachable from both endpoints gives inf - inf = NaN, which never compares greater
+        for landmark_to_target, landmark_to_node in zip(target_from, self.dist_from[node].tolist()):
+            gap = landmark_to_target - landmark_to_node
+            if gap > bound:
+                bound = gap
+        for node_to_landmark, target_to_landmark in zip(self.dist_to[node].tolist(), target_to):
+            gap = node_to_landmark - target_to_landmark
+            if gap > bound:
+                bound = gap
+        return bound
+
+    def shortest_path(self, source, target):
+        """Point-to-point A* search using landmark bounds; returns (cost, node path)"""
+        target_from = self.dist_from[target].tolist()
+        target_to = self.dist_to[target].tolist()
+        indptr, indices, weights = self.graph.adjacency()
+
+        dist = {source: 0.0}
+        parent = {source: -1}
+        settled = set()
+        # A node's bound depends only on the target, so compute it once per query
+        bounds = {}
+        heap = [(self._lower_bound(source, target_from, target_to), source)]
+
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in settled:
+                continue
+            if u == target:
+                break
+            settled.add(u)
+
+            du = dist[u]
+            for i in range(indptr[u], indptr[u + 1]):
+                v = indices[i]
+                nd = du + weights[i]
+                if nd < dist.get(v, np.inf):
+                    dist[v] = nd
+                    parent[v] = u
+                    if v not in bounds:
+                        bounds[v] = self._lower_bound(v, target_from, target_to)
+                    heapq.heappush(heap, (nd + bounds[v], v))
+
+        if target not in dist:
+            return np.inf, []
+
+        path = [target]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        return dist[target], path[::-1]
+
+    def one_to_many(self, source, targets):
+        """Costs from source to each target, sharing one search that stops once all are settled"""
+        targets = np.asarray(targets, dtype=np.int64)
+        dist = dijkstra(self.graph, source, targets=targets)
+        return dist[targets]
+
+    def isochrone(self, source, max_cost):
+        """Nodes reachable from source within max_cost, with their costs"""
+        dist = dijkstra(self.graph, source, max_cost=max_cost)
+        nodes = np.flatnonzero(dist <= max_cost)
+        return nodes, dist[nodes]
+
+    def save(self, path):
+        """Persist the graph and its landmark tables so start-up skips precomputation"""
+        graph = self.graph
+        arrays = {
+            'indptr': graph.indptr,
+            'indices': graph.indices,
+            'weights': graph.weights,
+            'landmarks': self.landmarks,
+            'dist_from': self.dist_from,
+            'dist_to': self.dist_to
+        }
+        if graph.lon is not None and graph.lat is not None:
+            arrays['lon'] = graph.lon
+            arrays['lat'] = graph.lat
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path, precompute=False):
+        """Load a network file written by save(); raw edge lists (sources, targets, weights) need precompute=True"""
+        with np.load(path) as data:
+            lon = data['lon'] if 'lon' in data else None
+            lat = data['lat'] if 'lat' in data else None
+
+            if 'indptr' not in data:
+                if not precompute:
+                    raise RuntimeError(f'{path} is a raw edge list; build it offline with RoutingEngine.load(path, '
+                                       'precompute=True).save(out_path) and point the service at the saved file')
+                graph = RoutingGraph.from_edges(data['sources'], data['targets'], data['weights'],
+                                                num_nodes=None if lon is None else len(lon), lon=lon, lat=lat)
+                return cls(graph)
+
+            graph = RoutingGraph(data['indptr'], data['indices'], data['weights'], lon=lon, lat=lat)
+            engine = cls.__new__(cls)
+            engine.graph = graph
+            engine.reverse_graph = graph.reversed()
+            engine.landmarks = data['landmarks']
+            engine.dist_from = data['dist_from']
+            engine.dist_to = data['dist_to']
+            return engine
+
+def synthetic_grid_network(rows, cols, seed=0, origin=(20.0, 78.0), spacing=0.05):
+    """Generate a jittered grid road network with random travel times, for testing and demos"""
+    rng = np.random.default_rng(seed)
+    node_ids = np.arange(rows * cols).reshape(rows, cols)
+
+    horizontal = np.stack([node_ids[:, :-1].ravel(), node_ids[:, 1:].ravel()])
+    vertical = np.stack([node_ids[:-1, :].ravel(), node_ids[1:, :].ravel()])
+    edges = np.concatenate([horizontal, vertical], axis=1)
+    weights = rng.uniform(1.0, 10.0, edges.shape[1])
+
+    lat = origin[0] + np.repeat(np.arange(rows), cols) * spacing + rng.normal(0, spacing / 10, rows * cols)
+    lon = origin[1] + np.tile(np.arange(cols), rows) * spacing + rng.normal(0, spacing / 10, rows * cols)
+
+    return RoutingGraph.from_edges(edges[0], edges[1], weights, num_nodes=rows * cols, lon=lon, lat=lat)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_routing_engine(mode='road'):
+    """Return the shared routing engine for a transport mode, loading it on first use"""
+    if mode not in NETWORK_PATH_ENV:
+        raise ValueError(f"Unknown transport mode '{mode}'. Use one of: {', '.join(NETWORK_PATH_ENV)}")
+
+    with _engines_lock:
+        if mode not in _engines:
+            path = os.environ.get(NETWORK_PATH_ENV[mode])
+            if not path or not os.path.exists(path):
+                return None
+            _engines[mode] = RoutingEngine.load(path)
+
+        return _engines[mode]
@@ -0,0 +1,208 @@
+import math
+import threading
+from datetime import datetime, timezone
+import numpy as np
+
+# Rolling windows kept per series: bucket width in seconds and number of buckets retained
+WINDOWS = {
+    'hourly': (3600, 48),
+    'daily': (86400, 30)
+}
+
+# Metrics accepted by the ingestion endpoint
+METRICS = ('aqi', 'pm25', 'rainfall_mm')
+
+LEVELS = ('city', 'district')
+
+def parse_timestamp(value):
+    """Epoch seconds from epoch numbers or ISO 8601 strings (naive strings are taken as UTC)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Bucket start times are rendered as datetimes, so the epoch value must be representable as one
+        try:
+            datetime.fromtimestamp(value, timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError(f'Timestamp {value} is out of range')
+        seconds = float(value)
+    elif isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        seconds = parsed.timestamp()
+    else:
+        raise ValueError(f'Timestamp must be epoch seconds or an ISO 8601 string, got {value!r}')
+
+    # Ring buffers use bucket -1 to mean empty, so pre-epoch readings would be folded in but never reported
+    if seconds < 0:
+        raise ValueError(f'Timestamp {value} is before 1970-01-01T00:00:00Z')
+    return seconds
+
+def _finite(value, field):
+    """A reading field as a finite float, raising ValueError otherwise"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Reading {field} must be a number, got {value!r}')
+    if isinstance(value, bool) or not math.isfinite(number):
+        raise ValueError(f'Reading {field} must be a finite number, got {value!r}')
+    return number
+
+def parse_reading(reading):
+    """Validate one reading into (metric, places, timestamp, value, lon, lat), raising ValueError if malformed"""
+    if not isinstance(reading, dict):
+        raise ValueError('Each reading must be an object')
+    metric = reading['metric']
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}")
+
+    places = [(level, reading[level]) for level in LEVELS if reading.get(level) is not None]
+    if not places:
+        raise ValueError(f"Each reading needs at least one of: {', '.join(LEVELS)}")
+    for level, place in places:
+        if not isinstance(place, str) or not place:
+            raise ValueError(f'Reading {level} must be a non-empty string, got {place!r}')
+
+    # Coordinates feed the place's mean position, so take both or neither
+    lon, lat = reading.get('lon'), reading.get('lat')
+    if (lon is None) != (lat is None):
+        raise ValueError('Reading lon and lat must be given together')
+    if lon is not None:
+        lon, lat = _finite(lon, 'lon'), _finite(lat, 'lat')
+
+    return metric, places, parse_timestamp(reading['timestamp']), _finite(reading['value'], 'value'), lon, lat
+
+class RingWindow:
+    """Fixed number of time buckets in a ring buffer, each holding sum, max and count"""
+
+    def __init__(self, width, size):
+        self.width = width
+        self.size = size
+        self.bucket_ids = np.full(size, -1, dtype=np.int64)
+        self.sums = np.zeros(size)
+        self.maxima = np.full(size, -np.inf)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.latest = -1
+
+    def add(self, timestamp, value):
+        """Fold one reading into its bucket; returns False if it is older than the window"""
+        bucket = int(timestamp // self.width)
+        if bucket <= self.latest - self.size:
+            return False
+
+        slot = bucket % self.size
+        if self.bucket_ids[slot] != bucket:
+            # The slot still holds a bucket that has rolled out of the window
+            self.bucket_ids[slot] = bucket
+            self.sums[slot] = 0.0
+            self.maxima[slot] = -np.inf
+            self.counts[slot] = 0
+
+        self.sums[slot] += value
+        self.maxima[slot] = max(self.maxima[slot], value)
+        self.counts[slot] += 1
+        self.latest = max(self.latest, bucket)
+        return True
+
+    def current(self):
+        """Aggregate of the most recent bucket"""
+        if self.latest < 0:
+            return None
+        slot = self.latest % self.size
+        return self._bucket(slot)
+
+    def series(self):
+        """All buckets still inside the window, oldest first"""
+        live = np.flatnonzero(self.bucket_ids > self.latest - self.size)
+        live = live[np.argsort(self.bucket_ids[live])]
+        return [self._bucket(slot) for slot in live]
+
+    def _bucket(self, slot):
+        """Summary of one ring slot"""
+        count = int(self.counts[slot])
+        return {
+            'start': datetime.fromtimestamp(int(self.bucket_ids[slot]) * self.width, timezone.utc).isoformat(),
+            'mean': float(self.sums[slot] / count),
+            'max': float(self.maxima[slot]),
+            'sum': float(self.sums[slot]),
+            'count': count
+        }
+
+class SeriesAggregate:
+    """Rolling hourly and daily aggregates for one metric at one place"""
+
+    def __init__(self):
+        self.windows = {name: RingWindow(width, size) for name, (width, size) in WINDOWS.items()}
+        self.lon_sum = 0.0
+        self.lat_sum = 0.0
+        self.located = 0
+
+    def add(self, timestamp, value, lon=None, lat=None):
+        """Fold a reading into every window; returns False if every window rejected it as too old"""
+        accepted = [window.add(timestamp, value) for window in self.windows.values()]
+        if any(accepted) and lon is not None and lat is not None:
+            # Running mean position lets the place act as an interpolation station
+            self.lon_sum += lon
+            self.lat_sum += lat
+            self.located += 1
+        return any(accepted)
+
+    def location(self):
+        """Mean reported position, or None if no reading carried coordinates"""
+        if not self.located:
+            return None
+        return self.lon_sum / self.located, self.lat_sum / self.located
+
+    def current(self):
+        """Current hourly and daily aggregates"""
+        return {name: window.current() for name, window in self.windows.items()}
+
+class SensorAggregateStore:
+    """Incrementally maintained aggregates keyed by (metric, level) and then place"""
+
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def ingest(self, readings):
+        """Fold a batch of readings in; returns (accepted, rejected) counts"""
+        # Validate the whole batch first so a bad reading never leaves it half applied
+        parsed = [parse_reading(reading) for reading in readings]
+
+        accepted = rejected = 0
+        with self.lock:
+            for metric, places, timestamp, value, lon, lat in parsed:
+                ok = False
+                for level, place in places:
+                    aggregates = self.series.setdefault((metric, level), {})
+                    aggregate = aggregates.get(place) or SeriesAggregate()
+                    # A place is only stored once a window holds one of its readings, so it always has a current bucket
+                    if aggregate.add(timestamp, value, lon, lat):
+                        aggregates[place] = aggregate
+                        ok = True
+
+                if ok:
+                    accepted += 1
+                else:
+                    rejected += 1
+        return accepted, rejected
+
+    def current(self, metric, level, place):
+        """Current aggregates for one place, or None if it has never reported"""
+        with self.lock:
+            aggregate = self.series.get((metric, level), {}).get(place)
+            return None if aggregate is None else aggregate.current()
+
+    def history(self, metric, level, place, window):
+        """Retained buckets of one window for one place"""
+        with self.lock:
+            aggregate = self.series.get((metric, level), {}).get(place)
+            return [] if aggregate is None else aggregate.windows[window].series()
+
+    def places(self, metric, level):
+        """Current aggregates and location of every place reporting a metric at a level"""
+        with self.lock:
+            return {
+                place: {'current': aggregate.current(), 'location': aggregate.location()}
+                for place, aggregate in self.series.get((metric, level), {}).items()
+            }
+
+sensor_store = SensorAggregateStore()
@@ -1,16 +1,41 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 import geopandas as gpd
 import pandas as pd
 from shapely.geometry import Point, Polygon
 import json
 import io
+import time
 import base64
 import folium
 from folium import plugins
 import numpy as np
+from src.routes.feature_store import DEFAULT_QUERY_LIMIT, feature_store
+from src.routes.india_air_quality import (
+    DEFAULT_RESOLUTION_KM,
+    INDIA_BOUNDS,
+    SAMPLE_AQI_STATIONS,
+    get_interpolated_surface
+)
+from src.routes.india_census import ROLLUP_LEVELS, get_census_cube
+from src.routes.india_flood import get_district_flood_scores
+from src.routes.india_routing import get_routing_engine
+from src.routes.india_sensor_ingest import LEVELS, METRICS, WINDOWS, parse_timestamp, sensor_store
+from src.routes.single_flight import SingleFlight
 
 india_spatial_bp = Blueprint('india_spatial', __name__)
 
+# Upper bound on queries accepted by a single /analyze/batch request
+MAX_BATCH_QUERIES = 100
+
+# Identical /analyze requests that arrive while one is running share its result
+analyze_flight = SingleFlight()
+
+# District risk score (0-10) at or above which a district counts as flood-prone
+FLOOD_PRONE_RISK_SCORE = 5.0
+
+# Live daily buckets that started longer ago than this are too stale to report as a place's current reading
+LIVE_DAILY_MAX_AGE_S = 2 * 86400
+
 class IndiaChainOfThoughtAnalyzer:
     """Chain-of-thought reasoning for Indian spatial analysis tasks"""
     
@@ -115,12 +140,34 @@ class IndiaChainOfThoughtAnalyzer:
             
         return results
     
+    def execute_batch(self, step_lists, sample_data=True):
+        """Execute several step lists, running each distinct (action, params) step only once"""
+        shared_results = {}
+        batch_results = []
+        
+        for steps in step_lists:
+            results = []
+            for step in steps:
+                key = _step_key(step)
+                if key not in shared_results:
+                    shared_results[key] = self.execute_analysis([step], sample_data)[0]
+                    
+                # Fan the shared result back out with this query's step numbering
+                result = shared_results[key]
+                if isinstance(result, dict):
+                    result = dict(result, step=step['step'])
+                results.append(result)
+                
+            batch_results.append(results)
+            
+        return batch_results, len(shared_results)
+    
     def _generate_india_sample_result(self, step):
         """Generate sample analysis results for Indian context"""
         action = step['action']
         
         if action == 'monsoon_analysis':
-            return {
+            result = {
                 'step': step['step'],
                 'action': action,
                 'result': {
@@ -133,6 +180,20 @@ class IndiaChainOfThoughtAnalyzer:
                 'explanation': 'Southwest monsoon covers 85.2% of India with 1200mm average rainfall. 45 districts face drought risk.'
             }
             
+            # Add current daily rainfall from ingested gauge readings when any district has reported recently
+            daily = [
+                place['current']['daily']['sum']
+                for place in sensor_store.places('rainfall_mm', 'district').values()
+                if _is_recent(place['current']['daily'])
+            ]
+            if daily:
+                result['result'].update({
+                    'districts_reporting': len(daily),
+                    'mean_daily_rainfall_mm': round(float(np.mean(daily)), 1),
+                    'max_daily_rainfall_mm': round(float(np.max(daily)), 1)
+                })
+            return result
+            
         elif action == 'agricultural_analysis':
             return {
                 'step': step['step'],
@@ -162,34 +223,73 @@ class IndiaChainOfThoughtAnalyzer:
             }
             
         elif action == 'pollution_analysis':
+            # City values are read off the cached interpolated AQI surface
+            stations, timestamp = _current_aqi_stations()
+            surface = get_interpolated_surface(stations, timestamp)
+            cities = {station['name']: station for station in SAMPLE_AQI_STATIONS}
+            aqi = {
+                name: int(round(float(surface.value_at(cities[name]['lon'], cities[name]['lat']))))
+                for name in ('Delhi', 'Mumbai', 'Kolkata')
+            }
             return {
                 'step': step['step'],
                 'action': action,
                 'result': {
-                    'aqi_delhi': 168,  # Air Quality Index
-                    'aqi_mumbai': 145,
-                    'aqi_kolkata': 152,
+                    'aqi_delhi': aqi['Delhi'],  # Air Quality Index
+                    'aqi_mumbai': aqi['Mumbai'],
+                    'aqi_kolkata': aqi['Kolkata'],
+                    'aqi_national_mean': round(float(surface.values.mean()), 1),
+                    'aqi_national_max': round(float(surface.values.max()), 1),
                     'cities_exceeding_who_limits': 22,
                     'pm25_annual_average': 58.0  # μg/m³
                 },
-                'explanation': 'Delhi AQI: 168, Mumbai: 145. 22 cities exceed WHO air quality limits.'
+                'explanation': f"Delhi AQI: {aqi['Delhi']}, Mumbai: {aqi['Mumbai']}. 22 cities exceed WHO air quality limits."
             }
             
         elif action == 'disaster_risk_analysis':
+            result = {
+                'flood_prone_districts': 89,
+                'cyclone_affected_coastal_length': 7516,  # km
+                'earthquake_high_risk_zones': 11,
+                'drought_vulnerable_area_percentage': 68,
+                'disaster_preparedness_score': 5.8
+            }
+            explanation = '89 districts flood-prone, 7516km cyclone-affected coast. 68% area drought-vulnerable.'
+
+            # DEM-derived district scores replace the flood count when a precomputed scores file is configured
+            flood_scores = get_district_flood_scores()
+            if flood_scores is not None:
+                flood_prone = sum(1 for score in flood_scores.values() if score['risk_score'] >= FLOOD_PRONE_RISK_SCORE)
+                result.update({
+                    'flood_prone_districts': flood_prone,
+                    'districts_analyzed': len(flood_scores),
+                    'flood_prone_risk_threshold': FLOOD_PRONE_RISK_SCORE
+                })
+                explanation = (f'{flood_prone} of {len(flood_scores)} districts flood-prone from DEM flow accumulation '
+                               'and wetness, 7516km cyclone-affected coast. 68% area drought-vulnerable.')
+
             return {
                 'step': step['step'],
                 'action': action,
-                'result': {
-                    'flood_prone_districts': 89,
-                    'cyclone_affected_coastal_length': 7516,  # km
-                    'earthquake_high_risk_zones': 11,
-                    'drought_vulnerable_area_percentage': 68,
-                    'disaster_preparedness_score': 5.8
-                },
-                'explanation': '89 districts flood-prone, 7516km cyclone-affected coast. 68% area drought-vulnerable.'
+                'result': result,
+                'explanation': explanation
             }
             
         elif action == 'demographic_analysis':
+            # National figures come straight from the latest census year's precomputed rollup
+            cube = get_census_cube()
+            if cube is not None:
+                year = cube.years()[-1]
+                columns, ratios = cube.indicators()
+                national = cube.query(year, 'india', [name for name in ('population',) if name in columns] + ratios)['units'][0]
+                if 'population' in national:
+                    national['total_population_billions'] = round(national.pop('population') / 1e9, 3)
+                return {
+                    'step': step['step'],
+                    'action': action,
+                    'result': dict(national, census_year=year),
+                    'explanation': f'National demographic indicators from the {year} census rolled up from village level.'
+                }
             return {
                 'step': step['step'],
                 'action': action,
@@ -212,7 +312,8 @@ class IndiaChainOfThoughtAnalyzer:
                     'highway_network_km': 142126,
                     'airports_count': 148,
                     'major_ports': 12,
-                    'connectivity_index': 6.7
+                    'connectivity_index': 6.7,
+                    'routing_networks': _routing_network_summary()
                 },
                 'explanation': '68,043km railway, 142,126km highway network. 148 airports, 12 major ports.'
             }
@@ -235,6 +336,48 @@ class IndiaChainOfThoughtAnalyzer:
         # This would contain actual geoprocessing logic with real Indian data
         pass
 
+def _step_key(step):
+    """Identity of an analysis step for deduplication: its action plus its parameters"""
+    params = json.dumps(step.get('params', {}), sort_keys=True, default=str)
+    return (step['action'], params)
+
+def _is_recent(bucket):
+    """Whether a live daily bucket is fresh enough to count as a place's current reading"""
+    return bucket is not None and parse_timestamp(bucket['start']) >= time.time() - LIVE_DAILY_MAX_AGE_S
+
+def _current_aqi_stations():
+    """Sample city readings with recent live AQI daily means substituted or added per city"""
+    stations = {station['name']: station for station in SAMPLE_AQI_STATIONS}
+    latest = None
+    for city, place in sensor_store.places('aqi', 'city').items():
+        daily = place['current']['daily']
+        if place['location'] is None or not _is_recent(daily):
+            continue
+        lon, lat = place['location']
+        stations[city] = {'name': city, 'lon': lon, 'lat': lat, 'value': daily['mean']}
+        latest = max(latest or daily['start'], daily['start'])
+    
+    if latest is None:
+        return SAMPLE_AQI_STATIONS, 'sample'
+    return list(stations.values()), latest
+
+def _routing_network_summary():
+    """Size of each loaded routing network, so results show which modes can answer route queries"""
+    summary = {}
+    for mode in ('road', 'rail'):
+        engine = get_routing_engine(mode)
+        if engine is not None:
+            summary[mode] = {
+                'nodes': engine.graph.num_nodes,
+                'edges': len(engine.graph.indices),
+                'landmarks': len(engine.landmarks)
+            }
+    return summary
+
+def _sse_event(event, data):
+    """Format a payload as a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 def create_india_sample_map():
     """Create a sample map focused on India with spatial analysis results"""
     # Create a map centered on India
@@ -321,6 +464,27 @@ def create_india_sample_map():
     
     return map_html
 
+def _analyze_key(user_query, data):
+    """Coalescing key: the normalized query plus any other request parameters"""
+    params = {name: value for name, value in data.items() if name != 'query'}
+    return (' '.join(user_query.lower().split()), json.dumps(params, sort_keys=True, default=str))
+
+def _run_india_analysis(user_query):
+    """Decompose, execute and map one query"""
+    # Initialize India-specific chain-of-thought analyzer
+    analyzer = IndiaChainOfThoughtAnalyzer()
+    
+    # Decompose the task
+    analysis_steps = analyzer.decompose_task(user_query)
+    
+    # Execute analysis
+    results = analyzer.execute_analysis(analysis_steps)
+    
+    # Generate India-focused map visualization
+    map_html = create_india_sample_map()
+    
+    return analysis_steps, results, map_html
+
 @india_spatial_bp.route('/analyze', methods=['POST'])
 def analyze_india_spatial_data():
     """Main endpoint for India-specific spatial analysis requests"""
@@ -331,17 +495,11 @@ def analyze_india_spatial_data():
         if not user_query:
             return jsonify({'error': 'Query is required'}), 400
         
-        # Initialize India-specific chain-of-thought analyzer
-        analyzer = IndiaChainOfThoughtAnalyzer()
-        
-        # Decompose the task
-        analysis_steps = analyzer.decompose_task(user_query)
-        
-        # Execute analysis
-        results = analyzer.execute_analysis(analysis_steps)
-        
-        # Generate India-focused map visualization
-        map_html = create_india_sample_map()
+        # Concurrent identical queries wait on one computation instead of each running it
+        (analysis_steps, results, map_html), coalesced = analyze_flight.do(
+            _analyze_key(user_query, data),
+            lambda: _run_india_analysis(user_query)
+        )
         
         response = {
             'query': user_query,
@@ -350,7 +508,8 @@ def analyze_india_spatial_data():
             'map_html': map_html,
             'summary': f"Completed {len(analysis_steps)} India-specific analysis steps for: {user_query}",
             'country_focus': 'India',
-            'geographic_scope': 'Indian subcontinent'
+            'geographic_scope': 'Indian subcontinent',
+            'coalesced': coalesced
         }
         
         return jsonify(response)
@@ -358,6 +517,341 @@ def analyze_india_spatial_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@india_spatial_bp.route('/analyze/stream', methods=['GET', 'POST'])
+def stream_india_spatial_analysis():
+    """Stream the chain of thought over Server-Sent Events: plan, each step result, then the map"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        user_query = data.get('query', '')
+    else:
+        # EventSource clients can only issue GET requests
+        user_query = request.args.get('query', '')
+    
+    if not user_query:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    def generate():
+        try:
+            analyzer = IndiaChainOfThoughtAnalyzer()
+            
+            # Emit the decomposed plan before any step runs
+            analysis_steps = analyzer.decompose_task(user_query)
+            yield _sse_event('plan', {
+                'query': user_query,
+                'chain_of_thought': analysis_steps
+            })
+            
+            # Emit each step result as soon as it completes
+            for step in analysis_steps:
+                result = analyzer.execute_analysis([step])[0]
+                yield _sse_event('step', result)
+            
+            # The map is the slowest part, so it goes last
+            yield _sse_event('map', {'map_html': create_india_sample_map()})
+            
+            yield _sse_event('done', {
+                'summary': f"Completed {len(analysis_steps)} India-specific analysis steps for: {user_query}",
+                'country_focus': 'India',
+                'geographic_scope': 'Indian subcontinent'
+            })
+            
+        except Exception as e:
+            yield _sse_event('error', {'error': str(e)})
+    
+    headers = {
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies from buffering the stream
+        'X-Accel-Buffering': 'no'
+    }
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+
+@india_spatial_bp.route('/analyze/batch', methods=['POST'])
+def analyze_india_spatial_batch():
+    """Analyze many queries at once, executing each shared analysis step a single time"""
+    try:
+        data = request.get_json() or {}
+        queries = data.get('queries', [])
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'error': 'A non-empty list of queries is required'}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return jsonify({'error': f'At most {MAX_BATCH_QUERIES} queries are allowed per batch'}), 400
+        if not all(isinstance(query, str) and query for query in queries):
+            return jsonify({'error': 'Every query must be a non-empty string'}), 400
+        
+        analyzer = IndiaChainOfThoughtAnalyzer()
+        
+        # Decompose all queries together so identical steps can be shared
+        step_lists = [analyzer.decompose_task(query) for query in queries]
+        
+        # Execute each distinct step once and fan results back out per query
+        batch_results, unique_steps = analyzer.execute_batch(step_lists)
+        
+        # One map serves the whole batch
+        map_html = create_india_sample_map()
+        
+        responses = []
+        for query, steps, results in zip(queries, step_lists, batch_results):
+            responses.append({
+                'query': query,
+                'chain_of_thought': steps,
+                'results': results,
+                'summary': f"Completed {len(steps)} India-specific analysis steps for: {query}"
+            })
+        
+        total_steps = sum(len(steps) for steps in step_lists)
+        
+        return jsonify({
+            'responses': responses,
+            'map_html': map_html,
+            'total_steps': total_steps,
+            'unique_steps_executed': unique_steps,
+            'summary': f"Completed {len(queries)} queries with {unique_steps} distinct analysis steps out of {total_steps}",
+            'country_focus': 'India',
+            'geographic_scope': 'Indian subcontinent'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/route', methods=['POST'])
+def india_route():
+    """Shortest path, one-to-many costs or isochrone over the road or rail network"""
+    try:
+        data = request.get_json() or {}
+        mode = data.get('mode', 'road')
+        origin = data.get('origin')
+        
+        if not origin:
+            return jsonify({'error': 'Origin [lon, lat] is required'}), 400
+        
+        engine = get_routing_engine(mode)
+        if engine is None:
+            return jsonify({'error': f'No {mode} network is loaded'}), 503
+        
+        graph = engine.graph
+        source = graph.nearest_node(*origin)
+        response = {'mode': mode, 'origin_node': source}
+        
+        if data.get('destination'):
+            target = graph.nearest_node(*data['destination'])
+            cost, path = engine.shortest_path(source, target)
+            response.update({
+                'destination_node': target,
+                'cost': None if np.isinf(cost) else cost,
+                'path': {
+                    'type': 'LineString',
+                    'coordinates': [[graph.lon[node], graph.lat[node]] for node in path]
+                }
+            })
+        
+        elif data.get('destinations'):
+            targets = [graph.nearest_node(*point) for point in data['destinations']]
+            costs = engine.one_to_many(source, targets)
+            response.update({
+                'destination_nodes': targets,
+                'costs': [None if np.isinf(cost) else float(cost) for cost in costs]
+            })
+        
+        elif data.get('max_cost') is not None:
+            nodes, costs = engine.isochrone(source, float(data['max_cost']))
+            response.update({
+                'max_cost': float(data['max_cost']),
+                'reachable_nodes': len(nodes),
+                'reachable': {
+                    'type': 'MultiPoint',
+                    'coordinates': np.column_stack([graph.lon[nodes], graph.lat[nodes]]).tolist()
+                },
+                'costs': costs.tolist()
+            })
+        
+        else:
+            return jsonify({'error': 'One of destination, destinations or max_cost is required'}), 400
+        
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/flood-risk', methods=['GET'])
+def india_flood_risk():
+    """Per-district flood susceptibility precomputed from a DEM"""
+    try:
+        flood_scores = get_district_flood_scores()
+        if flood_scores is None:
+            return jsonify({'error': 'No precomputed district flood scores are configured'}), 503
+        
+        districts = [dict(score, district_id=district) for district, score in sorted(flood_scores.items())]
+        return jsonify({
+            'districts': districts,
+            'flood_prone_risk_threshold': FLOOD_PRONE_RISK_SCORE,
+            'country_focus': 'India'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/aqi-surface', methods=['POST'])
+def india_aqi_surface():
+    """Interpolate AQI or PM2.5 station readings onto a grid over a city or state extent"""
+    try:
+        data = request.get_json() or {}
+        stations = data.get('stations', SAMPLE_AQI_STATIONS)
+        timestamp = data.get('timestamp', 'sample')
+        bounds = data.get('bounds', INDIA_BOUNDS)
+        resolution_km = float(data.get('resolution_km', DEFAULT_RESOLUTION_KM))
+        method = data.get('method', 'idw')
+        
+        if len(bounds) != 4 or bounds[0] >= bounds[2] or bounds[1] >= bounds[3]:
+            return jsonify({'error': 'Bounds must be [min_lon, min_lat, max_lon, max_lat]'}), 400
+        if resolution_km <= 0:
+            return jsonify({'error': 'Resolution must be positive'}), 400
+        
+        surface = get_interpolated_surface(stations, timestamp, bounds, resolution_km, method)
+        return jsonify(dict(surface.to_dict(), timestamp=timestamp, stations_used=len(stations)))
+        
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/ingest', methods=['POST'])
+def india_ingest_readings():
+    """Append time-stamped sensor readings and update rolling city and district aggregates"""
+    try:
+        data = request.get_json() or {}
+        readings = data.get('readings', [])
+        
+        if not isinstance(readings, list) or not readings:
+            return jsonify({'error': 'A non-empty list of readings is required'}), 400
+        
+        accepted, rejected = sensor_store.ingest(readings)
+        return jsonify({'accepted': accepted, 'rejected_as_too_old': rejected})
+        
+    except KeyError as e:
+        return jsonify({'error': f'Reading is missing field {e}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/aggregates', methods=['GET'])
+def india_sensor_aggregates():
+    """Current rolling aggregates for a metric, for one place or every reporting place"""
+    metric = request.args.get('metric', 'aqi')
+    level = request.args.get('level', 'city')
+    place = request.args.get('place')
+    window = request.args.get('window')
+    
+    if metric not in METRICS or level not in LEVELS:
+        return jsonify({'error': f"Metric must be one of {', '.join(METRICS)} and level one of {', '.join(LEVELS)}"}), 400
+    if window is not None and window not in WINDOWS:
+        return jsonify({'error': f"Window must be one of {', '.join(WINDOWS)}"}), 400
+    
+    if place is None:
+        return jsonify({'metric': metric, 'level': level, 'places': sensor_store.places(metric, level)})
+    
+    current = sensor_store.current(metric, level, place)
+    if current is None:
+        return jsonify({'error': f'No {metric} readings for {level} {place}'}), 404
+    
+    response = {'metric': metric, 'level': level, 'place': place, 'current': current}
+    if window is not None:
+        response['history'] = sensor_store.history(metric, level, place, window)
+    return jsonify(response)
+
+@india_spatial_bp.route('/features', methods=['GET'])
+def india_features_in_bbox():
+    """Stored features intersecting ?bbox=min_lon,min_lat,max_lon,max_lat, found via the R*Tree index"""
+    try:
+        bbox = request.args.get('bbox', '')
+        try:
+            bbox = [float(value) for value in bbox.split(',')]
+        except ValueError:
+            bbox = []
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            return jsonify({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat'}), 400
+        
+        layer = request.args.get('layer')
+        limit = request.args.get('limit', str(DEFAULT_QUERY_LIMIT))
+        if not limit.isdecimal() or int(limit) < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        limit = min(int(limit), DEFAULT_QUERY_LIMIT)
+        features = feature_store.query_bbox(bbox, layer=layer, limit=limit)
+        
+        return jsonify({
+            'type': 'FeatureCollection',
+            'features': features,
+            'bbox': bbox,
+            'truncated': len(features) >= limit
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/features', methods=['POST'])
+def india_load_features():
+    """Bulk-load a GeoJSON FeatureCollection into a feature store layer"""
+    try:
+        data = request.get_json() or {}
+        layer = data.get('layer')
+        features = data.get('features', [])
+        
+        if not layer:
+            return jsonify({'error': 'Layer is required'}), 400
+        if not isinstance(features, list) or not all(isinstance(f, dict) and f.get('geometry') for f in features):
+            return jsonify({'error': 'Features must be a list of GeoJSON features with geometries'}), 400
+        
+        loaded = feature_store.bulk_load(layer, features, replace=bool(data.get('replace')))
+        return jsonify({'layer': layer, 'loaded': loaded, 'layers': feature_store.layers()})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@india_spatial_bp.route('/census/query', methods=['POST'])
+def india_census_query():
+    """Group-by, filter and ratio queries over the census rollup cube at any administrative level"""
+    try:
+        cube = get_census_cube()
+        if cube is None:
+            return jsonify({'error': 'No census data is configured'}), 503
+        
+        data = request.get_json() or {}
+        year = int(data.get('census_year', cube.years()[-1]))
+        level = data.get('administrative_level', 'state')
+        indicators = data.get('indicators') or ['population', 'population_density_per_km2']
+        limit = data.get('limit')
+        
+        within = data.get('within')
+        
+        if level not in ROLLUP_LEVELS:
+            return jsonify({'error': f"Administrative level must be one of: {', '.join(ROLLUP_LEVELS)}"}), 400
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        if within is not None and not isinstance(within, dict):
+            return jsonify({'error': 'within must be an object of {level: code}'}), 400
+        
+        result = cube.query(
+            year,
+            level,
+            indicators,
+            within=within,
+            filters=data.get('filters'),
+            sort_by=data.get('sort_by'),
+            descending=data.get('descending', True),
+            limit=limit
+        )
+        return jsonify(result)
+        
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @india_spatial_bp.route('/tools', methods=['GET'])
 def get_india_spatial_tools():
     """Get list of India-specific spatial analysis tools"""
@@ -383,7 +877,7 @@ def get_india_spatial_tools():
         {
             'name': 'Pollution Analysis',
             'description': 'Analyze air and water pollution across Indian regions',
-            'parameters': ['pollution_type', 'city', 'monitoring_period'],
+            'parameters': ['pollution_type', 'city', 'monitoring_period', 'method', 'resolution_km'],
             'use_cases': ['Environmental monitoring', 'Health impact assessment', 'Policy planning']
         },
         {
@@ -395,8 +889,14 @@ def get_india_spatial_tools():
         {
             'name': 'Demographic Analysis',
             'description': 'Analyze population distribution and demographic trends',
-            'parameters': ['demographic_indicator', 'administrative_level', 'census_year'],
+            'parameters': ['demographic_indicator', 'administrative_level', 'census_year', 'within', 'filters', 'sort_by'],
             'use_cases': ['Resource allocation', 'Development planning', 'Electoral analysis']
+        },
+        {
+            'name': 'Transportation Analysis',
+            'description': 'Shortest paths, travel costs and isochrones over road and rail networks',
+            'parameters': ['mode', 'origin', 'destination', 'destinations', 'max_cost'],
+            'use_cases': ['Connectivity assessment', 'Service catchments', 'Logistics planning']
         }
     ]
     
@@ -504,6 +1004,11 @@ def get_indian_states():
     
     return jsonify(states_data)
 
+@india_spatial_bp.route('/metrics', methods=['GET'])
+def india_metrics():
+    """Request coalescing counters for the analyze endpoint"""
+    return jsonify({'analyze_single_flight': analyze_flight.stats()})
+
 @india_spatial_bp.route('/health', methods=['GET'])
 def india_health_check():
     """Health check endpoint for India-specific service"""
@@ -523,7 +1028,8 @@ def india_health_check():
             'urban_planning_analysis',
             'pollution_analysis',
             'disaster_risk_analysis',
-            'demographic_analysis'
+            'demographic_analysis',
+            'transportation_analysis'
         ]
     })
 
@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from flask import Flask, send_from_directory
 from flask_cors import CORS
 from src.models.user import db
+from src.routes.feature_store import feature_store
 from src.routes.user import user_bp
 from src.routes.spatial_analysis import spatial_bp
 from src.routes.india_spatial_analysis import india_spatial_bp
@@ -27,6 +28,9 @@ db.init_app(app)
 with app.app_context():
     db.create_all()
 
+# Spatial features live in the same SQLite file, indexed by an R*Tree
+feature_store.init_app(app)
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
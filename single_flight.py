@@ -0,0 +1,58 @@
+import threading
+
+class _Call:
+    """One in-flight computation that later callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution whose result they all share"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn for key, or wait for the identical call already running; returns (result, shared)"""
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                shared = True
+            else:
+                call = self.calls[key] = _Call()
+                self.executions += 1
+                shared = False
+
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Later requests start a fresh computation instead of reusing a finished one
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def stats(self):
+        """Counts of executed and coalesced calls, plus calls currently in flight"""
+        with self.lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self.calls)
+            }
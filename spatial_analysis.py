@@ -1,16 +1,55 @@
 from flask import Blueprint, request, jsonify
 import geopandas as gpd
 import pandas as pd
-from shapely.geometry import Point, Polygon
+from shapely.geometry import Point, Polygon, shape
 import json
 import io
 import base64
 import folium
 from folium import plugins
 import numpy as np
+from shapely.errors import ShapelyError
+from src.routes.green_accessibility import (
+    DEFAULT_RESOLUTION_M,
+    get_accessibility_surface,
+    green_space_polygon,
+    register_city_green_spaces
+)
 
 spatial_bp = Blueprint('spatial', __name__)
 
+# Sample green spaces shown on the demo map and used for the accessibility surface
+SAMPLE_GREEN_SPACES = [
+    {'lat': 40.7829, 'lon': -73.9654, 'name': 'Central Park', 'area': 3.41},
+    {'lat': 40.7505, 'lon': -73.9934, 'name': 'Bryant Park', 'area': 0.039},
+    {'lat': 40.7021, 'lon': -73.9969, 'name': 'Washington Square Park', 'area': 0.039}
+]
+
+SAMPLE_CITY = 'new_york'
+
+# Distance within which a green space counts as accessible, in meters
+DEFAULT_ACCESSIBILITY_THRESHOLD_M = 500
+
+register_city_green_spaces(
+    SAMPLE_CITY,
+    [green_space_polygon(space['lon'], space['lat'], space['area']) for space in SAMPLE_GREEN_SPACES]
+)
+
+def _ward_geometries(wards):
+    """Parse a ward FeatureCollection into (properties, geometry) pairs, raising ValueError on malformed features"""
+    features = wards.get('features') if isinstance(wards, dict) else None
+    if not isinstance(features, list) or not all(isinstance(f, dict) and isinstance(f.get('geometry'), dict) for f in features):
+        raise ValueError('Wards must be a FeatureCollection of GeoJSON features with geometries')
+
+    parsed = []
+    for feature in features:
+        try:
+            geom = shape(feature['geometry'])
+        except (KeyError, TypeError, ValueError, AttributeError, ShapelyError):
+            raise ValueError(f"Ward geometry is not valid GeoJSON: {feature['geometry'].get('type')}")
+        parsed.append((feature.get('properties') or {}, geom))
+    return parsed
+
 class ChainOfThoughtAnalyzer:
     """Chain-of-thought reasoning for spatial analysis tasks"""
     
@@ -104,16 +143,22 @@ class ChainOfThoughtAnalyzer:
         action = step['action']
         
         if action == 'green_space_analysis':
+            # Figures come from the cached distance-transform surface for the sample city
+            surface = get_accessibility_surface(SAMPLE_CITY)
+            summary = surface.summary(DEFAULT_ACCESSIBILITY_THRESHOLD_M)
             return {
                 'step': step['step'],
                 'action': action,
                 'result': {
-                    'total_green_space_area': 2.5,  # km²
-                    'green_space_percentage': 15.3,
-                    'average_distance_to_green_space': 0.8,  # km
-                    'accessibility_score': 7.2
+                    'total_green_space_area': summary['total_green_space_area'],  # km²
+                    'green_space_percentage': summary['green_space_percentage'],
+                    'average_distance_to_green_space': summary['average_distance_to_green_space'],  # km
+                    'accessibility_score': round(summary['share_within_threshold'] * 10, 1)
                 },
-                'explanation': 'Analysis shows 15.3% green space coverage with good accessibility (average 0.8km distance)'
+                'explanation': (
+                    f"Analysis shows {summary['green_space_percentage']}% green space coverage "
+                    f"(average {summary['average_distance_to_green_space']}km distance)"
+                )
             }
             
         elif action == 'density_analysis':
@@ -164,13 +209,7 @@ def create_sample_map():
     m = folium.Map(location=[40.7128, -74.0060], zoom_start=12)
     
     # Add sample green spaces
-    green_spaces = [
-        {'lat': 40.7829, 'lon': -73.9654, 'name': 'Central Park', 'area': 3.41},
-        {'lat': 40.7505, 'lon': -73.9934, 'name': 'Bryant Park', 'area': 0.039},
-        {'lat': 40.7021, 'lon': -73.9969, 'name': 'Washington Square Park', 'area': 0.039}
-    ]
-    
-    for space in green_spaces:
+    for space in SAMPLE_GREEN_SPACES:
         folium.CircleMarker(
             location=[space['lat'], space['lon']],
             radius=space['area'] * 5,
@@ -240,6 +279,56 @@ def analyze_spatial_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@spatial_bp.route('/accessibility', methods=['POST'])
+def green_space_accessibility():
+    """Distance to the nearest green space for points and wards, read from the cached surface"""
+    try:
+        data = request.get_json() or {}
+        city = data.get('city', SAMPLE_CITY)
+        resolution = float(data.get('resolution', DEFAULT_RESOLUTION_M))
+        threshold = float(data.get('accessibility_threshold', DEFAULT_ACCESSIBILITY_THRESHOLD_M))
+        
+        if resolution <= 0:
+            return jsonify({'error': 'Resolution must be positive'}), 400
+        
+        wards = _ward_geometries(data['wards']) if data.get('wards') else None
+        surface = get_accessibility_surface(city, resolution)
+        response = {
+            'city': city,
+            'resolution_m': resolution,
+            'summary': surface.summary(threshold)
+        }
+        
+        # Per-point accessibility is a single vectorized grid lookup
+        points = data.get('points', [])
+        if points:
+            try:
+                coords = np.asarray(points, dtype=float)
+            except (TypeError, ValueError):
+                coords = np.empty(0)
+            if coords.ndim != 2 or coords.shape[1] != 2:
+                return jsonify({'error': 'Points must be a list of [lon, lat] pairs'}), 400
+            distances = surface.distance_at(coords[:, 0], coords[:, 1])
+            response['point_distances_m'] = [None if np.isnan(d) else round(float(d), 1) for d in distances]
+        
+        if wards is not None:
+            response['wards'] = [
+                {
+                    'properties': properties,
+                    'accessibility': surface.zone_statistics(geom, threshold)
+                }
+                for properties, geom in wards
+            ]
+        
+        return jsonify(response)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @spatial_bp.route('/tools', methods=['GET'])
 def get_available_tools():
     """Get list of available spatial analysis tools"""